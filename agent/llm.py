@@ -1,11 +1,19 @@
 """LLM factory module for multi-provider support."""
 
+from __future__ import annotations
+
 import importlib
 import os
-from typing import Callable, Literal, Optional
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, Literal, Optional
 
 import httpx
-from langchain_openai import ChatOpenAI, AzureChatOpenAI
+
+# langchain_openai (and the openai SDK under it) takes about a second to
+# import. It is imported on first model construction instead, so importing
+# the API and its routers stays fast.
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI, AzureChatOpenAI
 
 from core.logging import get_logger
 
@@ -20,6 +28,18 @@ DEFAULT_MODELS = {
 }
 
 
+def _get_service_tier(tier: LLMTier) -> Optional[str]:
+    """Get the OpenAI service tier for the specified LLM tier.
+
+    Only the fast tier (failure classifier, reporter) is latency-sensitive,
+    so LLM_SERVICE_TIER_FAST (e.g. "priority") is applied to it alone. The
+    default tier is left on the account's standard processing.
+    """
+    if tier != "fast":
+        return None
+    return os.getenv("LLM_SERVICE_TIER_FAST") or None
+
+
 def _get_http_clients() -> tuple[Optional[httpx.Client], Optional[httpx.AsyncClient]]:
     """Get HTTP clients with SSL verification settings."""
     ssl_verify = os.getenv("LLM_SSL_VERIFY", "true").lower()
@@ -88,11 +108,16 @@ def _get_openai_model(tier: LLMTier) -> ChatOpenAI:
     http_client, async_http_client = _get_http_clients()
 
     kwargs = {"model": model_name, "api_key": api_key}
+    service_tier = _get_service_tier(tier)
+    if service_tier:
+        kwargs["service_tier"] = service_tier
     if http_client:
         kwargs["http_client"] = http_client
     if async_http_client:
         kwargs["http_async_client"] = async_http_client
 
+    from langchain_openai import ChatOpenAI
+
     return ChatOpenAI(**kwargs)
 
 
@@ -129,6 +154,8 @@ def _get_azure_model(tier: LLMTier) -> AzureChatOpenAI:
     if async_http_client:
         kwargs["http_async_client"] = async_http_client
 
+    from langchain_openai import AzureChatOpenAI
+
     return AzureChatOpenAI(**kwargs)
 
 
@@ -165,6 +192,55 @@ def get_llm(tier: LLMTier = "default") -> ChatOpenAI | AzureChatOpenAI:
         )
 
 
+def _has_static_api_key(provider: str) -> bool:
+    """Check if the provider's API key comes from a static env var."""
+    env_var = "AZURE_OPENAI_API_KEY" if provider == "azure" else "OPENAI_API_KEY"
+    return bool(os.getenv(env_var))
+
+
+def _build_structured_llm(tier: LLMTier, schema: type, partial: bool) -> Any:
+    """Bind a structured output schema to the tier's LLM."""
+    if partial:
+        from langchain_core.output_parsers import JsonOutputParser
+
+        # The Pydantic class is bound as response_format so the OpenAI SDK
+        # sends its strict JSON schema, the same as the non-partial path. The
+        # JSON parser turns the streamed content into growing partial dicts.
+        return get_llm(tier).bind(response_format=schema) | JsonOutputParser()
+    return get_llm(tier).with_structured_output(schema)
+
+
+@lru_cache(maxsize=16)
+def _get_cached_structured_llm(provider: str, tier: LLMTier, schema: type, partial: bool) -> Any:
+    """Build and memoize a structured-output runnable per provider/tier/schema."""
+    return _build_structured_llm(tier, schema, partial)
+
+
+def get_structured_llm(tier: LLMTier, schema: type, partial: bool = False) -> Any:
+    """
+    Get an LLM runnable bound to a structured output schema.
+
+    The runnable (and the JSON schema derived from the Pydantic model) is
+    built once and reused. When the API key comes from a key function
+    (dynamic/short-lived keys), a fresh runnable is built on every call so
+    the key is never pinned.
+
+    Args:
+        tier: LLM tier, see get_llm.
+        schema: Pydantic model class for with_structured_output.
+        partial: If True, the runnable returns plain dicts and astream yields
+                 progressively more complete partial dicts. Callers validate
+                 the final dict against schema themselves.
+
+    Returns:
+        Runnable that returns instances of schema (or dicts if partial).
+    """
+    provider = os.getenv("LLM_PROVIDER", "openai").lower()
+    if not _has_static_api_key(provider):
+        return _build_structured_llm(tier, schema, partial)
+    return _get_cached_structured_llm(provider, tier, schema, partial)
+
+
 def _has_api_key(env_var: str, func_env_var: str) -> bool:
     """Check if API key is available via env var or function."""
     if os.getenv(env_var):
@@ -1,13 +1,17 @@
 """Failure classification for intelligent test retry."""
 
+import asyncio
 import base64
+import hashlib
+from string import Template
 from typing import Literal, Optional
 
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.messages import HumanMessage
+from cachetools import TTLCache
+from langchain_core.messages import HumanMessage, SystemMessage
 from pydantic import BaseModel, Field
 
-from agent.llm import get_llm
+from agent.llm import get_structured_llm
+from agent.utils.errors import normalize_error
 from core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -50,8 +54,8 @@ class FailureClassification(BaseModel):
     )
 
 
-CLASSIFIER_PROMPT = ChatPromptTemplate.from_messages([
-    ("system", """You are a test failure classifier for a browser automation system.
+_SYSTEM = """\
+You are a test failure classifier for a browser automation system.
 Analyze the test step failure and determine if it should be retried.
 
 ## Failure Categories
@@ -79,18 +83,48 @@ NOT RETRYABLE failures (actual test failures or app issues):
 5. If the screenshot shows an error message or validation error - likely not retryable
 6. If the screenshot shows a blank/loading page - likely retryable (timing)
 
-Be conservative: if uncertain, classify as "unknown" with is_retryable=false."""),
-    ("human", """Classify this test step failure:
+Be conservative: if uncertain, classify as "unknown" with is_retryable=false."""
 
-Action: {action}
-Target: {target}
-Value: {value}
-Error: {error_message}
+_SYSTEM_MSG = SystemMessage(content=_SYSTEM)
 
-{screenshot_note}
+# Classifications keyed by (screenshot hash, action, target, value, normalized
+# error). Re-runs of the same failing step skip the vision call entirely.
+_classification_cache: TTLCache = TTLCache(maxsize=512, ttl=60 * 60)
+
+# Compiled once; substitute() avoids re-parsing format specs on every call.
+_HUMAN_TEMPLATE = Template("""\
+Classify this test step failure:
+
+Action: $action
+Target: $target
+Value: $value
+Error: $error_message
+
+$screenshot_note
 
 Determine if this failure should be retried.""")
-])
+
+_SCREENSHOT_NOTE = "A screenshot of the failure is attached for analysis."
+
+
+def _cache_key(
+    action: str,
+    target: Optional[str],
+    value: Optional[str],
+    error_message: str,
+    screenshot_b64: Optional[str],
+) -> tuple[str, str, str, str, str]:
+    """Build the classification cache key for a failure.
+
+    Target and value are part of the prompt, so they are part of the key too;
+    otherwise unrelated steps with the same normalized error share a verdict.
+    Identical base64 text means identical image bytes, so the encoded screenshot
+    is hashed directly rather than decoded first.
+    """
+    digest = ""
+    if screenshot_b64:
+        digest = hashlib.blake2b(screenshot_b64.encode(), digest_size=16).hexdigest()
+    return digest, action, target or "", value or "", normalize_error(error_message)
 
 
 async def classify_failure(
@@ -112,59 +146,49 @@ async def classify_failure(
     Returns:
         FailureClassification with is_retryable, category, confidence, and reasoning
     """
-    model = get_llm("fast")
-
-    # Prepare the prompt
-    screenshot_note = ""
-    if screenshot_b64:
-        screenshot_note = "A screenshot of the failure is attached for analysis."
+    cache_key = _cache_key(action, target, value, error_message, screenshot_b64)
+    cached = _classification_cache.get(cache_key)
+    if cached is not None:
+        logger.debug("Failure classification cache hit: category=%s", cached.failure_category)
+        return cached
 
-    # Build messages
-    messages = []
+    structured_model = get_structured_llm("fast", FailureClassification)
 
-    # Format the prompt
-    prompt_messages = CLASSIFIER_PROMPT.format_messages(
+    human_text = _HUMAN_TEMPLATE.substitute(
         action=action,
         target=target or "(none)",
         value=value or "(none)",
         error_message=error_message,
-        screenshot_note=screenshot_note,
+        screenshot_note=_SCREENSHOT_NOTE if screenshot_b64 else "",
     )
 
     # If we have a screenshot, use vision capability
     if screenshot_b64:
-        # Convert to vision message format
-        system_msg = prompt_messages[0]
-        human_content = prompt_messages[1].content
-
-        messages = [
-            system_msg,
-            HumanMessage(content=[
-                {"type": "text", "text": human_content},
-                {
-                    "type": "image_url",
-                    "image_url": {
-                        "url": f"data:image/png;base64,{screenshot_b64}",
-                        "detail": "low",  # Use low detail for faster processing
-                    },
+        human_msg = HumanMessage(content=[
+            {"type": "text", "text": human_text},
+            {
+                "type": "image_url",
+                "image_url": {
+                    "url": f"data:image/png;base64,{screenshot_b64}",
+                    "detail": "low",  # Use low detail for faster processing
                 },
-            ]),
-        ]
+            },
+        ])
     else:
-        messages = prompt_messages
+        human_msg = HumanMessage(content=human_text)
 
-    # Get structured output
-    structured_model = model.with_structured_output(FailureClassification)
+    messages = [_SYSTEM_MSG, human_msg]
 
     try:
         result = await structured_model.ainvoke(messages)
         logger.info(
-            f"Failure classified: category={result.failure_category}, "
-            f"retryable={result.is_retryable}, confidence={result.confidence:.2f}"
+            "Failure classified: category=%s, retryable=%s, confidence=%.2f",
+            result.failure_category, result.is_retryable, result.confidence,
         )
+        _classification_cache[cache_key] = result
         return result
     except Exception as e:
-        logger.error(f"Failed to classify failure: {e}")
+        logger.error("Failed to classify failure: %s", e)
         # Return conservative default
         return FailureClassification(
             is_retryable=False,
@@ -174,6 +198,47 @@ async def classify_failure(
         )
 
 
+async def classify_failure_once(
+    groups: dict[tuple[str, str, str, str, str], "asyncio.Future[FailureClassification]"],
+    action: str,
+    target: Optional[str],
+    value: Optional[str],
+    error_message: str,
+    screenshot_b64: Optional[str] = None,
+) -> FailureClassification:
+    """Classify a failure once per group of identical failures in a batch.
+
+    Groups use the classification cache key (screenshot, action, target, value
+    and normalized error), so only failures of the same step share a verdict;
+    concurrent callers await the same in-flight call.
+
+    Args:
+        groups: Per-batch mapping of group key to classification future
+        action: The action that failed (e.g., "click", "type")
+        target: The target element (if any)
+        value: The action value (if any)
+        error_message: The error message from the failure
+        screenshot_b64: Optional base64-encoded screenshot of the failure
+
+    Returns:
+        FailureClassification shared by every failure in the group
+    """
+    key = _cache_key(action, target, value, error_message, screenshot_b64)
+    future = groups.get(key)
+    if future is None:
+        future = asyncio.ensure_future(classify_failure(
+            action=action,
+            target=target,
+            value=value,
+            error_message=error_message,
+            screenshot_b64=screenshot_b64,
+        ))
+        groups[key] = future
+    else:
+        logger.debug("Reusing failure classification for action=%s", action)
+    return await asyncio.shield(future)
+
+
 def is_retryable_category(category: FailureCategory) -> bool:
     """Check if a failure category is retryable."""
     return category in RETRYABLE_CATEGORIES
@@ -0,0 +1,64 @@
+"""Heal memory — remembers healer target corrections for repeated failures.
+
+When the healer fixes a stale target (e.g. "Block button" → "Blog"), the
+correction is stored against (test_case_id, step_number, error signature).
+The next time the same step fails with the same error, the stored target is
+reused without an LLM call.
+"""
+
+import hashlib
+from typing import Optional
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel import Session
+
+from agent.utils.errors import normalize_error
+from db import crud
+from db.models import HealMemory
+from db.session import engine
+from core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def error_signature(error: Optional[str]) -> str:
+    """Hash a normalized error message into a fixed-size lookup key."""
+    return hashlib.sha1(normalize_error(error).encode()).hexdigest()
+
+
+def lookup_heal(
+    test_case_id: int,
+    step_number: int,
+    error: Optional[str],
+) -> Optional[HealMemory]:
+    """Return the learned heal for a failing step, or None on miss/DB error."""
+    try:
+        with Session(engine) as session:
+            return crud.get_heal_memory(
+                session, test_case_id, step_number, error_signature(error)
+            )
+    except SQLAlchemyError as exc:
+        logger.warning("Heal memory lookup failed: %s", exc)
+        return None
+
+
+def record_heal(
+    test_case_id: int,
+    step_number: int,
+    error: Optional[str],
+    original_target: Optional[str],
+    healed_target: str,
+) -> None:
+    """Store a healed target for a failing step. Errors are logged, not raised."""
+    try:
+        with Session(engine) as session:
+            crud.upsert_heal_memory(
+                session,
+                test_case_id=test_case_id,
+                step_number=step_number,
+                error_hash=error_signature(error),
+                original_target=original_target,
+                healed_target=healed_target,
+            )
+    except SQLAlchemyError as exc:
+        logger.warning("Heal memory record failed: %s", exc)
@@ -1,11 +1,15 @@
 """Auto-heal node — analyzes a failed test run and proposes corrected steps."""
 
-from typing import Optional
+import asyncio
+import inspect
+from typing import AsyncIterator, Awaitable, Optional, Union
 
 from langchain_core.messages import HumanMessage
 from pydantic import BaseModel, Field
 
-from agent.llm import get_llm
+from agent.llm import get_structured_llm
+from agent.nodes.heal_memory import lookup_heal, record_heal
+from agent.utils.errors import normalize_error
 from core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -96,36 +100,90 @@ Analyse the failure(s) and return the full corrected step list.
 
 
 # ---------------------------------------------------------------------------
-# Core function
+# Heal memory
 # ---------------------------------------------------------------------------
 
-async def suggest_heal(
-    test_case_name: str,
-    natural_query: str,
-    base_url: str,
+def _suggest_from_memory(
+    test_case_id: int,
     original_steps: list[dict],
-    failed_steps: list[dict],   # TestRunStep rows: step_number, action, target, value, error, screenshot
-    page_elements: Optional[list[str]] = None,  # live DOM scan of the failing page
-) -> HealSuggestion:
-    """Produce a healed step list by inspecting failure evidence via LLM.
+    failed_steps: list[dict],
+) -> Optional[HealSuggestion]:
+    """Build a suggestion from learned heals if every failed step has one."""
+    healed_targets: dict[int, str] = {}
+    for fs in failed_steps:
+        sn = fs.get("step_number")
+        if not isinstance(sn, int) or not 1 <= sn <= len(original_steps):
+            return None
+        memory = lookup_heal(test_case_id, sn, fs.get("error"))
+        # Only reuse the heal while the step still has the target it was learned from
+        if not memory or original_steps[sn - 1].get("target") != memory.original_target:
+            return None
+        healed_targets[sn] = memory.healed_target
+
+    if not healed_targets:
+        return None
+
+    healed_steps = []
+    for i, s in enumerate(original_steps, 1):
+        healed_steps.append(HealedStep(
+            action=s.get("action", ""),
+            target=healed_targets.get(i, s.get("target")),
+            value=s.get("value"),
+            description=s.get("description", ""),
+            change_reason="cached-heal" if i in healed_targets else None,
+        ))
+
+    return HealSuggestion(
+        healed_steps=healed_steps,
+        changed_step_numbers=sorted(healed_targets),
+        explanation=(
+            f"Reused {len(healed_targets)} previously accepted fix(es) "
+            "for this exact failure."
+        ),
+        confidence=0.9,
+    )
 
-    Args:
-        test_case_name: Display name of the test case.
-        natural_query:  Original intent written by the user.
-        base_url:       Project base URL for context.
-        original_steps: The test case's current step list (list of dicts).
-        failed_steps:   Rows from TestRunStep that have status="failed".
-                        Each dict should contain step_number, action, target,
-                        value, error, and optionally screenshot (base64 PNG).
-        page_elements:  Optional live-scanned list of visible element texts on
-                        the page at the point of failure. When provided, the LLM
-                        can match stale/misspelled targets to real element names.
 
-    Returns:
-        HealSuggestion with healed_steps, changed_step_numbers, explanation,
-        and confidence.
+def remember_heal(
+    test_case_id: int,
+    original_steps: list[dict],
+    failed_steps: list[dict],
+    healed_steps: list[HealedStep],
+) -> None:
+    """Store target corrections for failed steps from a heal the user accepted.
+
+    Only accepted heals are remembered; suggestions are never recorded, so a
+    rejected fix is not replayed on the next heal request.
     """
+    for fs in failed_steps:
+        sn = fs.get("step_number")
+        if not isinstance(sn, int):
+            continue
+        if not 1 <= sn <= min(len(original_steps), len(healed_steps)):
+            continue
+        original = original_steps[sn - 1]
+        healed = healed_steps[sn - 1]
+        if (
+            healed.target
+            and healed.action == original.get("action")
+            and healed.target != original.get("target")
+        ):
+            record_heal(test_case_id, sn, fs.get("error"), original.get("target"), healed.target)
+
 
+# ---------------------------------------------------------------------------
+# Core function
+# ---------------------------------------------------------------------------
+
+def _build_messages(
+    test_case_name: str,
+    natural_query: str,
+    base_url: str,
+    original_steps: list[dict],
+    failed_steps: list[dict],
+    page_elements: Optional[list[str]],
+) -> list:
+    """Format the failure evidence into system + human messages."""
     # --- format original steps -------------------------------------------------
     orig_lines = []
     for i, s in enumerate(original_steps, 1):
@@ -140,20 +198,27 @@ async def suggest_heal(
 
     # --- format failure details ------------------------------------------------
     # First failed step gets its screenshot; the rest are described as text only.
+    # Steps failing with the same (normalized) error share one copy of the
+    # error text, but each step keeps its own action, target and value.
     first_screenshot: Optional[str] = None
+    if failed_steps and failed_steps[0].get("screenshot"):
+        first_screenshot = failed_steps[0]["screenshot"]
+
+    error_groups: dict[str, list[dict]] = {}
+    for fs in failed_steps:
+        error_groups.setdefault(normalize_error(fs.get("error")), []).append(fs)
+
     failure_lines = []
-    for idx, fs in enumerate(failed_steps):
-        sn = fs.get("step_number", "?")
-        action = fs.get("action", "?")
-        target = fs.get("target") or "(none)"
-        value  = fs.get("value") or "(none)"
-        error  = fs.get("error") or "(unknown error)"
-        failure_lines.append(
-            f"Step {sn} [{action}] target={target} value={value}\n"
-            f"  Error: {error}"
-        )
-        if idx == 0 and fs.get("screenshot"):
-            first_screenshot = fs["screenshot"]
+    for group in error_groups.values():
+        step_lines = [
+            f"Step {fs.get('step_number', '?')} [{fs.get('action', '?')}] "
+            f"target={fs.get('target') or '(none)'} value={fs.get('value') or '(none)'}"
+            for fs in group
+        ]
+        if len(group) > 1:
+            step_lines.insert(0, f"{len(group)} steps failed with the same error:")
+        error = group[0].get("error") or "(unknown error)"
+        failure_lines.append("\n".join(step_lines) + f"\n  Error: {error}")
 
     failure_text = "\n".join(failure_lines) if failure_lines else "(no failed steps provided)"
 
@@ -201,31 +266,139 @@ async def suggest_heal(
     else:
         human_msg = HumanMessage(content=human_text)
 
-    messages = [
+    return [
         ("system", _SYSTEM),
         human_msg,
     ]
 
-    # --- call LLM with structured output -------------------------------------
-    model = get_llm("default")
-    structured_model = model.with_structured_output(HealSuggestion)
+
+async def stream_heal(
+    test_case_name: str,
+    natural_query: str,
+    base_url: str,
+    original_steps: list[dict],
+    failed_steps: list[dict],   # TestRunStep rows: step_number, action, target, value, error, screenshot
+    page_elements: Union[list[str], Awaitable[Optional[list[str]]], None] = None,  # live DOM scan of the failing page
+    test_case_id: Optional[int] = None,
+) -> AsyncIterator[Union[HealedStep, HealSuggestion]]:
+    """Stream a heal: yield each HealedStep as soon as the LLM completes it.
+
+    Takes the same arguments as suggest_heal. Steps are yielded in order; the
+    last item is always the complete HealSuggestion, which is authoritative
+    (on LLM failure it is a no-op suggestion and may not match the steps
+    already yielded).
+
+    page_elements may be an awaitable (e.g. a DOM scan task started by the
+    caller); it is only awaited once the learned-heal lookup misses, so the
+    scan overlaps with that lookup and is not waited on when memory answers.
+    The heal memory lookup runs in a worker thread; suggestions are not
+    recorded (see remember_heal).
+    """
+
+    # --- reuse learned heals -------------------------------------------------
+    if test_case_id is not None:
+        cached = await asyncio.to_thread(
+            _suggest_from_memory, test_case_id, original_steps, failed_steps
+        )
+        if cached:
+            logger.info(
+                "Heal suggestion from memory: %d step(s) changed",
+                len(cached.changed_step_numbers),
+            )
+            for step in cached.healed_steps:
+                yield step
+            yield cached
+            return
+
+    if inspect.isawaitable(page_elements):
+        page_elements = await page_elements
+
+    messages = _build_messages(
+        test_case_name, natural_query, base_url,
+        original_steps, failed_steps, page_elements,
+    )
+
+    # --- stream LLM structured output ----------------------------------------
+    # Partial dicts grow as tokens arrive; a step is complete once the next
+    # one has started, and the last step is complete when the stream ends.
+    structured_model = get_structured_llm("default", HealSuggestion, partial=True)
 
     try:
-        result: HealSuggestion = await structured_model.ainvoke(messages)
+        emitted = 0
+        partial: dict = {}
+        async for partial in structured_model.astream(messages):
+            steps = partial.get("healed_steps") or []
+            while emitted < len(steps) - 1:
+                yield HealedStep.model_validate(steps[emitted])
+                emitted += 1
+
+        result = HealSuggestion.model_validate(partial)
+        for step in result.healed_steps[emitted:]:
+            yield step
+
         logger.info(
-            f"Heal suggestion: {len(result.changed_step_numbers)} step(s) changed, "
-            f"confidence={result.confidence:.2f}"
+            "Heal suggestion: %d step(s) changed, confidence=%.2f",
+            len(result.changed_step_numbers), result.confidence,
         )
-        return result
+        yield result
     except Exception as exc:
-        logger.error(f"Healer LLM call failed: {exc}")
+        logger.error("Healer LLM call failed: %s", exc)
         # Return no-op suggestion so the frontend can still show the dialog.
-        return HealSuggestion(
+        # The steps are echoed back unchanged, so skip re-validation.
+        yield HealSuggestion.model_construct(
             healed_steps=[
-                HealedStep(**{k: v for k, v in s.items() if k in HealedStep.model_fields})
+                HealedStep.model_construct(
+                    action=s.get("action", ""),
+                    target=s.get("target"),
+                    value=s.get("value"),
+                    description=s.get("description", ""),
+                    change_reason=None,
+                )
                 for s in original_steps
             ],
             changed_step_numbers=[],
             explanation=f"Auto-heal analysis failed: {exc}",
             confidence=0.0,
         )
+
+
+async def suggest_heal(
+    test_case_name: str,
+    natural_query: str,
+    base_url: str,
+    original_steps: list[dict],
+    failed_steps: list[dict],   # TestRunStep rows: step_number, action, target, value, error, screenshot
+    page_elements: Union[list[str], Awaitable[Optional[list[str]]], None] = None,  # live DOM scan of the failing page
+    test_case_id: Optional[int] = None,
+) -> HealSuggestion:
+    """Produce a healed step list by inspecting failure evidence via LLM.
+
+    Args:
+        test_case_name: Display name of the test case.
+        natural_query:  Original intent written by the user.
+        base_url:       Project base URL for context.
+        original_steps: The test case's current step list (list of dicts).
+        failed_steps:   Rows from TestRunStep that have status="failed".
+                        Each dict should contain step_number, action, target,
+                        value, error, and optionally screenshot (base64 PNG).
+        page_elements:  Optional live-scanned list of visible element texts on
+                        the page at the point of failure. When provided, the LLM
+                        can match stale/misspelled targets to real element names.
+                        May be an awaitable resolving to that list; it is
+                        awaited only when the LLM is actually called.
+        test_case_id:   Optional test case ID. When provided, target fixes
+                        the user accepted for the same step and error are
+                        reused without an LLM call. Pass None to bypass the
+                        heal memory.
+
+    Returns:
+        HealSuggestion with healed_steps, changed_step_numbers, explanation,
+        and confidence.
+    """
+    result = None
+    async for item in stream_heal(
+        test_case_name, natural_query, base_url,
+        original_steps, failed_steps, page_elements, test_case_id,
+    ):
+        result = item
+    return result
@@ -1,14 +1,21 @@
 """Test planning node - converts natural language to test steps."""
 
+import asyncio
+import re
+from threading import Lock
+
+from cachetools import TTLCache
 from langchain_core.prompts import ChatPromptTemplate
-from agent.llm import get_llm
+from agent.llm import get_structured_llm
 from pydantic import BaseModel, Field
-from typing import List, Literal, Optional
+from sqlalchemy import event as sa_event
+from typing import Any, List, Literal, Optional
 
 from agent.state import AgentState, TestPlan, TestStep
 from sqlmodel import Session
 from db.session import engine
 from db import crud
+from db.models import Fixture, Page, Persona, Project
 from core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -23,6 +30,9 @@ ActionType = Literal[
 # Keep list for runtime validation if needed
 VALID_ACTIONS = list(ActionType.__args__)
 
+# Matches {{name}} or {{name.field}} placeholders in generated steps
+_PLACEHOLDER_RE = re.compile(r"\{\{([^}]+)\}\}")
+
 
 class TestStepModel(BaseModel):
     """A single test step mapped to Playwright MCP tools."""
@@ -56,21 +66,14 @@ class TestPlanModel(BaseModel):
     )
 
 
+# The system prompt is ordered from most to least stable so providers can reuse
+# the cached prefix: static instructions, then per-project context, then the
+# per-request feature and conversation. Keep template variables out of the
+# static block.
 PLANNER_PROMPT = ChatPromptTemplate.from_messages([
     ("system", """You are a QA test planner. Given a natural language test request,
 create a detailed test plan with browser actions that map to Playwright MCP tools.
 
-Project URL: {base_url}
-Feature to test: {feature}
-
-{app_context}
-
-{conversation_context}
-
-{personas_and_pages}
-
-{fixtures_context}
-
 CRITICAL: JSON Output Format Examples
 When outputting steps, use this exact JSON structure:
 
@@ -112,7 +115,7 @@ Available actions (mapped to Playwright):
 Guidelines:
 1. Use descriptive element names - Playwright uses accessibility tree, not CSS selectors
 2. Prefer fill_form for login/signup forms over multiple type actions
-3. Use wait_for_page after clicks that trigger page navigation or redirects (use the project's default page load event from Project Settings above)
+3. Use wait_for_page after clicks that trigger page navigation or redirects (use the project's default page load event from Project Settings below)
 4. Use wait for element/text to appear after dynamic content loads
 5. Use assert_text or assert_element to verify success
 6. Use assert_url to verify navigation to correct page or URL pattern. When user asks to "check if URL contains X", use pattern ".*X.*" (not the full URL). Examples: ".*dashboard.*", ".*login.*", ".*exampl.*"
@@ -122,11 +125,41 @@ Guidelines:
 10. IMPORTANT: If this is a follow-up request, MERGE with the previous plan - keep existing steps and add/modify as needed
 11. For style checks (colors, sizes), use assert_style with the CSS property and expected value
 12. If specific details are missing and NO matching persona/page exists, use placeholder like {{BUTTON_NAME}} and set needs_clarification=true
-13. FIXTURES: If your test needs login/auth, use the login fixture (add ID to fixture_ids) and start your steps AFTER login (don't write login steps yourself)"""),
+13. FIXTURES: If your test needs login/auth, use the login fixture (add ID to fixture_ids) and start your steps AFTER login (don't write login steps yourself)
+
+# Project
+
+Project URL: {base_url}
+
+{app_context}
+
+{personas_and_pages}
+
+{fixtures_context}
+
+# Current Request
+
+Feature to test: {feature}
+
+{conversation_context}"""),
     ("human", "{query}")
 ])
 
 
+# (structured model, chain) built on first use. Rebuilt only when
+# get_structured_llm hands back a different runnable (e.g. dynamic API keys).
+_planner_chain: Optional[tuple[Any, Any]] = None
+
+
+def _get_planner_chain():
+    """Return PLANNER_PROMPT piped into the cached structured-output model."""
+    global _planner_chain
+    structured_model = get_structured_llm("default", TestPlanModel)
+    if _planner_chain is None or _planner_chain[0] is not structured_model:
+        _planner_chain = (structured_model, PLANNER_PROMPT | structured_model)
+    return _planner_chain[1]
+
+
 def build_conversation_context(messages: list, previous_plan: Optional[dict]) -> str:
     """Build context from conversation history and previous test plan."""
     context_parts = []
@@ -149,47 +182,32 @@ def build_conversation_context(messages: list, previous_plan: Optional[dict]) ->
     return "\n".join(context_parts) if context_parts else "No previous context."
 
 
-def build_app_context(project_id: Optional[str]) -> str:
-    """Build app context from project's base_prompt and settings."""
-    if not project_id:
-        return ""
-
-    try:
-        pid = int(project_id)
-    except (ValueError, TypeError):
+def _format_app_context(project) -> str:
+    """Format app context from project's base_prompt and settings."""
+    if not project:
         return ""
 
     context_parts = []
 
-    with Session(engine) as session:
-        project = crud.get_project(session, pid)
-        if project:
-            # Add page load state setting
-            page_load_state = project.page_load_state or "load"
-            context_parts.append(f"## Project Settings\n- Default page load event: {page_load_state} (use this value for wait_for_page actions unless user specifies otherwise)")
-
-            # Add user-provided app context
-            if project.base_prompt:
-                context_parts.append(f"\n## App Context (provided by user)\n{project.base_prompt}")
+    # Add page load state setting
+    page_load_state = project.page_load_state or "load"
+    context_parts.append(f"## Project Settings\n- Default page load event: {page_load_state} (use this value for wait_for_page actions unless user specifies otherwise)")
 
-    return "\n".join(context_parts) if context_parts else ""
+    # Add user-provided app context
+    if project.base_prompt:
+        context_parts.append(f"\n## App Context (provided by user)\n{project.base_prompt}")
 
+    return "\n".join(context_parts)
 
-def build_personas_and_pages_context(project_id: Optional[str]) -> str:
-    """Build context about available personas and pages for the project."""
-    if not project_id:
-        return "No project context available."
 
-    try:
-        pid = int(project_id)
-    except (ValueError, TypeError):
-        return "No project context available."
+def _format_personas_and_pages(personas: list, pages: list) -> tuple[str, frozenset[str]]:
+    """Format context about available personas and pages for the project.
 
+    Returns:
+        (context string, template names the personas/pages make valid)
+    """
     context_parts = []
-
-    with Session(engine) as session:
-        personas = crud.get_personas_by_project(session, pid)
-        pages = crud.get_pages_by_project(session, pid)
+    valid_templates = set()
 
     if personas:
         context_parts.append("Available Personas (use these for login/authentication):")
@@ -197,70 +215,133 @@ def build_personas_and_pages_context(project_id: Optional[str]) -> str:
             desc = f" - {p.description}" if p.description else ""
             # Use double braces to escape in f-string: {{ becomes {, }} becomes }
             context_parts.append(f"  - '{p.name}': Use {{{{{p.name}.username}}}} for username, {{{{{p.name}.password}}}} for password{desc}")
+            valid_templates.add(f"{p.name}.username")
+            valid_templates.add(f"{p.name}.password")
 
     if pages:
         context_parts.append("\nAvailable Pages (use these for navigation):")
         for p in pages:
             desc = f" - {p.description}" if p.description else ""
             context_parts.append(f"  - '{p.name}': Use {{{{{p.name}}}}} which resolves to '{p.path}'{desc}")
+            valid_templates.add(p.name)
 
     if not context_parts:
-        return "No personas or pages configured for this project."
+        return "No personas or pages configured for this project.", frozenset()
 
-    return "\n".join(context_parts)
+    return "\n".join(context_parts), frozenset(valid_templates)
 
 
-def build_fixtures_context(project_id: Optional[str]) -> str:
-    """Build context about available fixtures for the project."""
-    if not project_id:
-        return ""
+_FIXTURES_HEADER = "## Available Fixtures (reusable setup sequences)"
 
-    try:
-        pid = int(project_id)
-    except (ValueError, TypeError):
-        return ""
+_FIXTURE_RULES = """
+FIXTURE RULES:
+1. If your test needs login/authentication, ALWAYS use the login fixture (add its ID to fixture_ids)
+2. When you use a fixture, your test steps start AFTER the fixture completes
+3. Do NOT write login/setup steps if you're using a fixture that already does that
+
+Example: Test 'verify dashboard shows user name' with login fixture:
+  - fixture_ids: [1]  (the login fixture)
+  - steps: navigate to /dashboard, assert_text 'Welcome'  (NO login steps needed)"""
+
+
+def _format_fixture(f) -> str:
+    """Format one fixture entry with a summary of its first steps."""
+    steps = f.get_setup_steps()
+    # Summarize what the fixture does
+    step_summary = ", ".join(s.get("action", "") for s in steps[:3])
+    if len(steps) > 3:
+        step_summary += f", ... ({len(steps)} steps total)"
+
+    description = f"\n    Description: {f.description}" if f.description else ""
+    return f"  - Fixture ID {f.id}: '{f.name}'{description}\n    Steps: {step_summary}"
 
-    with Session(engine) as session:
-        fixtures = crud.get_fixtures_by_project(session, pid)
 
+def _format_fixtures(fixtures: list) -> str:
+    """Format context about available fixtures for the project."""
     if not fixtures:
         return ""
 
-    context_parts = ["## Available Fixtures (reusable setup sequences)"]
-
-    for f in fixtures:
-        steps = f.get_setup_steps()
-        # Summarize what the fixture does
-        step_actions = [s.get("action", "") for s in steps[:3]]
-        step_summary = ", ".join(step_actions)
-        if len(steps) > 3:
-            step_summary += f", ... ({len(steps)} steps total)"
-
-        context_parts.append(f"  - Fixture ID {f.id}: '{f.name}'")
-        if f.description:
-            context_parts.append(f"    Description: {f.description}")
-        context_parts.append(f"    Steps: {step_summary}")
-
-    context_parts.append("")
-    context_parts.append("FIXTURE RULES:")
-    context_parts.append("1. If your test needs login/authentication, ALWAYS use the login fixture (add its ID to fixture_ids)")
-    context_parts.append("2. When you use a fixture, your test steps start AFTER the fixture completes")
-    context_parts.append("3. Do NOT write login/setup steps if you're using a fixture that already does that")
-    context_parts.append("")
-    context_parts.append("Example: Test 'verify dashboard shows user name' with login fixture:")
-    context_parts.append("  - fixture_ids: [1]  (the login fixture)")
-    context_parts.append("  - steps: navigate to /dashboard, assert_text 'Welcome'  (NO login steps needed)")
+    return "\n".join((_FIXTURES_HEADER, *map(_format_fixture, fixtures), _FIXTURE_RULES))
 
-    return "\n".join(context_parts)
+
+ProjectContexts = tuple[str, str, str, frozenset[str]]
+
+# Per-project planner context, keyed by (project_id, include_fixtures). Entries
+# are dropped when a project, persona, page or fixture row changes; the TTL
+# bounds staleness for bulk statements that bypass ORM events.
+_project_context_cache: TTLCache = TTLCache(maxsize=256, ttl=60)
+_project_context_lock = Lock()
+
+
+def _invalidate_project_context(mapper, connection, target) -> None:
+    """ORM event hook: forget cached context for the changed row's project."""
+    pid = target.id if isinstance(target, Project) else target.project_id
+    with _project_context_lock:
+        _project_context_cache.pop((pid, True), None)
+        _project_context_cache.pop((pid, False), None)
+
+
+for _model in (Project, Persona, Page, Fixture):
+    for _event_name in ("after_insert", "after_update", "after_delete"):
+        sa_event.listen(_model, _event_name, _invalidate_project_context)
+
+
+def _load_project_contexts(pid: int, include_fixtures: bool) -> ProjectContexts:
+    """Query and format the planner context for a project in one session."""
+    with Session(engine) as session:
+        project = crud.get_project(session, pid)
+        personas = crud.get_personas_by_project(session, pid)
+        pages = crud.get_pages_by_project(session, pid)
+        fixtures = crud.get_fixtures_by_project(session, pid) if include_fixtures else []
+
+        app_context = _format_app_context(project)
+        personas_and_pages, valid_templates = _format_personas_and_pages(personas, pages)
+        fixtures_context = _format_fixtures(fixtures)
+
+    return app_context, personas_and_pages, fixtures_context, valid_templates
+
+
+def build_project_contexts(
+    project_id: Optional[str],
+    include_fixtures: bool = True,
+) -> ProjectContexts:
+    """Return everything the planner needs about a project.
+
+    Results are cached per project for a short TTL and invalidated whenever
+    the project's personas, pages or fixtures change.
+
+    Args:
+        project_id: Project ID (string or int); falsy/invalid means no project.
+        include_fixtures: Skip the fixtures query when False (fixture generation).
+
+    Returns:
+        (app_context, personas_and_pages, fixtures_context, valid_templates),
+        where valid_templates holds the persona/page template names.
+    """
+    if not project_id:
+        return "", "No project context available.", "", frozenset()
+
+    try:
+        pid = int(project_id)
+    except (ValueError, TypeError):
+        return "", "No project context available.", "", frozenset()
+
+    key = (pid, include_fixtures)
+    with _project_context_lock:
+        cached = _project_context_cache.get(key)
+    if cached is not None:
+        return cached
+
+    contexts = _load_project_contexts(pid, include_fixtures)
+    with _project_context_lock:
+        _project_context_cache[key] = contexts
+    return contexts
 
 
 async def plan_test(state: AgentState) -> dict:
     """Convert natural language query to a test plan."""
     from langchain_core.messages import AIMessage
 
-    model = get_llm("default")
-    structured_model = model.with_structured_output(TestPlanModel)
-
     messages = state.get("messages", [])
     last_message = messages[-1].content if messages else ""
     previous_plan = state.get("test_plan")
@@ -275,19 +356,15 @@ async def plan_test(state: AgentState) -> dict:
     # Build conversation context
     conversation_context = build_conversation_context(messages, previous_plan)
 
-    # Build app context from base_prompt
-    app_context = build_app_context(project_id)
-
-    # Build personas and pages context
-    personas_and_pages = build_personas_and_pages_context(project_id)
-
-    # Build fixtures context (skip when generating fixtures to avoid circular dependencies)
-    if state.get("skip_fixtures_context"):
-        fixtures_context = ""
-    else:
-        fixtures_context = build_fixtures_context(project_id)
+    # Build app, personas/pages and fixtures context in one DB session, off the
+    # event loop (skip fixtures when generating fixtures to avoid circular dependencies)
+    app_context, personas_and_pages, fixtures_context, valid_templates = await asyncio.to_thread(
+        build_project_contexts,
+        project_id,
+        include_fixtures=not state.get("skip_fixtures_context"),
+    )
 
-    chain = PLANNER_PROMPT | structured_model
+    chain = _get_planner_chain()
 
     result = await chain.ainvoke({
         "base_url": project_url,
@@ -299,54 +376,34 @@ async def plan_test(state: AgentState) -> dict:
         "query": last_message
     })
 
+    # Dump the validated plan once; everything below reads plain dicts
+    plan = result.model_dump()
+    steps: list[TestStep] = plan["steps"]
+
     # Convert to TestPlan format
     test_plan: TestPlan = {
         "test_case_id": None,
         "natural_query": last_message,
-        "steps": [
-            {
-                "action": step.action,
-                "target": step.target,
-                "value": step.value,
-                "description": step.description,
-            }
-            for step in result.steps
-        ],
-        "expected_outcome": result.expected_outcome,
-        "fixture_ids": result.fixture_ids,
+        "steps": steps,
+        "expected_outcome": plan["expected_outcome"],
+        "fixture_ids": plan["fixture_ids"],
     }
 
-    logger.info(f"Generated test plan with {len(result.steps)} steps, fixtures: {result.fixture_ids}")
-
-    # Get available personas and pages to filter valid template variables
-    valid_templates = set()
-    if project_id:
-        try:
-            pid = int(project_id)
-            with Session(engine) as session:
-                personas = crud.get_personas_by_project(session, pid)
-                pages = crud.get_pages_by_project(session, pid)
-                for p in personas:
-                    valid_templates.add(f"{p.name}.username")
-                    valid_templates.add(f"{p.name}.password")
-                for p in pages:
-                    valid_templates.add(p.name)
-        except (ValueError, TypeError):
-            pass
+    logger.info(f"Generated test plan with {len(steps)} steps, fixtures: {plan['fixture_ids']}")
 
     # Check for placeholders in the plan (excluding valid persona/page templates)
     placeholders_found = []
-    import re
-    for step in result.steps:
-        for field in [step.target, step.value, step.description]:
+    for step in steps:
+        for field in (step["target"], step["value"], step["description"]):
             if field and "{{" in field:
                 # Extract placeholder names from {{name}} or {{name.field}} patterns
-                matches = re.findall(r'\{\{([^}]+)\}\}', field)
-                for match in matches:
+                for match in _PLACEHOLDER_RE.findall(field):
                     # Skip if this is a valid persona/page template
                     if match not in valid_templates:
                         placeholders_found.append(match)
 
+    step_lines = [f"{i}. {step['description']}" for i, step in enumerate(steps, 1)]
+
     # Build response message
     if placeholders_found:
         response_parts = ["**I need some details to complete this test plan:**\n"]
@@ -355,20 +412,18 @@ async def plan_test(state: AgentState) -> dict:
             readable_name = placeholder.replace("_", " ").lower()
             response_parts.append(f"- What is the **{readable_name}**?")
 
-        response_parts.append(f"\n**Draft Test Plan** ({len(result.steps)} steps):")
-        for i, step in enumerate(result.steps, 1):
-            response_parts.append(f"{i}. {step.description}")
+        response_parts.append(f"\n**Draft Test Plan** ({len(steps)} steps):")
+        response_parts.extend(step_lines)
 
         response_parts.append("\nPlease provide these details so I can finalize the test.")
     else:
-        response_parts = [f"**Test Plan** ({len(result.steps)} steps):\n"]
-        for i, step in enumerate(result.steps, 1):
-            response_parts.append(f"{i}. {step.description}")
+        response_parts = [f"**Test Plan** ({len(steps)} steps):\n"]
+        response_parts.extend(step_lines)
 
     # Also include clarification from structured output if present
-    if result.needs_clarification and result.clarification_questions:
+    if plan["needs_clarification"] and plan["clarification_questions"]:
         response_parts.append("\n**Additional questions:**")
-        for q in result.clarification_questions:
+        for q in plan["clarification_questions"]:
             response_parts.append(f"- {q}")
 
     return {
@@ -10,18 +10,28 @@ builder-quality steps (with proper actions, readable targets, waits, etc.).
 from __future__ import annotations
 
 import time
-from typing import Optional
+from dataclasses import dataclass
+from typing import Iterator, Optional, Sequence
 from urllib.parse import urlparse
 
-from pydantic import BaseModel, Field
-
 from core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Event timestamps are normalized to integer nanoseconds at ingress
+# (producers send epoch milliseconds).
+_CLICK_NAV_WINDOW_NS = 500_000_000  # link click + navigate within this → keep the click only
+_NAV_AFTER_CLICK_WINDOW_NS = 800_000_000  # navigate this soon after any click is redundant
+
+
+@dataclass(slots=True, kw_only=True)
+class ProcessedStep:
+    """A single processed test step ready for the frontend.
 
-class ProcessedStep(BaseModel):
-    """A single processed test step ready for the frontend."""
+    A plain slotted dataclass rather than a Pydantic model: one is built per
+    raw DOM event and the fields come from our own rules, so no validation is
+    needed. Serialize with to_dict().
+    """
     action: str
     target: Optional[str] = None
     value: Optional[str] = None
@@ -32,6 +42,18 @@ class ProcessedStep(BaseModel):
     locators: Optional[dict] = None  # Waterfall fallback: {css, text, ariaPath, coordinates}
     causes_navigation: bool = False  # True when click triggered page navigation
 
+    def to_dict(self) -> dict:
+        """Serialize for the frontend, omitting None and False fields.
+
+        Omitted keys read as null/false on the frontend and fall back to the
+        defaults of RecordedStepInput when steps are posted back.
+        """
+        return {
+            name: value
+            for name in self.__slots__
+            if (value := getattr(self, name)) is not None and value is not False
+        }
+
 
 class RecorderEventProcessor:
     """Stateful processor that converts raw recorder events into test steps.
@@ -44,22 +66,22 @@ class RecorderEventProcessor:
     def __init__(self, base_url: str = ""):
         self.steps: list[ProcessedStep] = []
         self._pending_click: dict | None = None
-        self._pending_click_ts: float = 0
+        self._pending_click_ts: int = 0  # ns
+        self._pending_type: ProcessedStep | None = None  # current typing burst
         self._last_navigate_url: str = ""
-        self._last_click_ts: float = 0  # timestamp of last emitted click (any tag)
+        self._last_click_ts: int = 0  # ns timestamp of last emitted click (any tag)
         self._base_url = base_url
         self._base_origin = ""
         if base_url:
             parsed = urlparse(base_url)
             self._base_origin = f"{parsed.scheme}://{parsed.netloc}"
+        self._base_origin_len = len(self._base_origin)
 
     def _to_relative_path(self, url: str) -> str:
         """Convert a full URL to a relative path if it shares the same origin."""
-        if not url or not self._base_origin:
-            return url
-        if url.startswith(self._base_origin):
-            path = url[len(self._base_origin):]
-            return path if path else "/"
+        origin = self._base_origin
+        if origin and url and url.startswith(origin):
+            return url[self._base_origin_len:] or "/"
         return url
 
     def process_event(self, event: dict) -> ProcessedStep | None:
@@ -69,12 +91,17 @@ class RecorderEventProcessor:
             A ProcessedStep if one is ready, None if the event was buffered.
         """
         event_type = event.get("type", "")
+        self._normalize(event)
+
+        # Any non-type event ends the current typing burst
+        typed = self._flush_pending_type() if event_type != "type" else None
+        if typed:
+            self.steps.append(typed)
 
         # If we have a pending click and a navigate arrives within 500ms,
         # KEEP the click and DROP the navigate (the click caused the navigation)
         if self._pending_click and event_type == "navigate":
-            elapsed = (event.get("timestamp", 0) - self._pending_click_ts)
-            if elapsed < 500:
+            if event["_ts_ns"] - self._pending_click_ts < _CLICK_NAV_WINDOW_NS:
                 # Flush the click as the actual step — skip the navigate
                 click_step = self._make_click_step(self._pending_click)
                 click_step.causes_navigation = True
@@ -89,22 +116,8 @@ class RecorderEventProcessor:
         # Flush any pending click before processing a non-navigate event
         flushed = self._flush_pending_click()
 
-        step = None
-
-        if event_type == "navigate":
-            step = self._process_navigate(event)
-        elif event_type == "click":
-            step = self._process_click(event)
-        elif event_type == "type":
-            step = self._process_type(event)
-        elif event_type == "select":
-            step = self._process_select(event)
-        elif event_type == "scroll":
-            step = self._process_scroll(event)
-        elif event_type == "hover":
-            step = self._process_hover(event)
-        else:
-            step = self._process_unknown(event)
+        handler = self._HANDLERS.get(event_type, RecorderEventProcessor._process_unknown)
+        step = handler(self, event)
 
         # If the click was flushed, append it before the current step
         if flushed:
@@ -113,7 +126,21 @@ class RecorderEventProcessor:
         if step:
             self.steps.append(step)
 
-        return flushed or step
+        return typed or flushed or step
+
+    @staticmethod
+    def _normalize(event: dict) -> None:
+        """Attach the upper-cased tag, stripped text and ns timestamp (0 if absent)."""
+        event["_tag"] = (event.get("tag") or "").upper()
+        event["_text"] = (event.get("text") or "").strip()
+        timestamp = event.get("timestamp")
+        event["_ts_ns"] = int(timestamp * 1_000_000) if timestamp else 0
+
+    def _flush_pending_type(self) -> ProcessedStep | None:
+        """Flush the buffered typing burst as a step."""
+        step = self._pending_type
+        self._pending_type = None
+        return step
 
     def _flush_pending_click(self) -> ProcessedStep | None:
         """Flush any buffered click event as a step."""
@@ -136,8 +163,8 @@ class RecorderEventProcessor:
         # Suppress navigates that follow a click within 800ms — the click
         # already navigated (via router.push, <a> href, etc.). Without this,
         # "Click Checkmate-qa" is followed by a redundant "Navigate to /projects/2".
-        nav_ts = event.get("timestamp", 0)
-        if self._last_click_ts and nav_ts and (nav_ts - self._last_click_ts) < 800:
+        nav_ts = event["_ts_ns"]
+        if self._last_click_ts and nav_ts and nav_ts - self._last_click_ts < _NAV_AFTER_CLICK_WINDOW_NS:
             self._last_navigate_url = relative
             return None
         self._last_navigate_url = relative
@@ -148,38 +175,41 @@ class RecorderEventProcessor:
         )
 
     def _process_click(self, event: dict) -> ProcessedStep | None:
-        tag = (event.get("tag") or "").upper()
+        tag = event["_tag"]
 
         # For links, buffer the click — a navigate event may follow
         if tag == "A":
             self._pending_click = event
-            self._pending_click_ts = event.get("timestamp", time.time() * 1000)
+            self._pending_click_ts = event["_ts_ns"] or time.time_ns()
             return None
 
         return self._make_click_step(event)
 
     def _make_click_step(self, event: dict) -> ProcessedStep:
         # Track click time for navigate suppression (any click, not just <a>)
-        self._last_click_ts = event.get("timestamp", 0)
+        self._last_click_ts = event["_ts_ns"]
 
-        tag = (event.get("tag") or "").upper()
-        text = event.get("text", "").strip()
+        tag = event["_tag"]
+        text = event["_text"]
         selector = event.get("selector", "")
 
         coords = event.get("coordinates")  # {x, y, pageX, pageY}
         aria_path = event.get("ariaPath", "")
 
         # Build locators dict for waterfall resolution at execution time.
-        # Each key is a strategy the executor can try in order.
-        locators: dict = {}
-        if selector:
-            locators["css"] = selector
-        if text:
-            locators["text"] = text
-        if aria_path:
-            locators["ariaPath"] = aria_path
-        if coords:
-            locators["coordinates"] = coords
+        # Each key is a strategy the executor can try in order. Only
+        # allocated when at least one strategy is available.
+        locators: dict | None = None
+        if selector or text or aria_path or coords:
+            locators = {}
+            if selector:
+                locators["css"] = selector
+            if text:
+                locators["text"] = text
+            if aria_path:
+                locators["ariaPath"] = aria_path
+            if coords:
+                locators["coordinates"] = coords
 
         # Prefer data-testid CSS selectors — they are unique per element and
         # allow the executor to find the exact element without ambiguity.
@@ -191,7 +221,7 @@ class RecorderEventProcessor:
                 description=desc,
                 confidence=1.0,
                 coordinates=coords,
-                locators=locators or None,
+                locators=locators,
             )
 
         # Determine target description
@@ -214,29 +244,41 @@ class RecorderEventProcessor:
             description=desc,
             confidence=0.9 if tag in ("BUTTON", "A", "INPUT") else 0.6,
             coordinates=coords,
-            locators=locators or None,
+            locators=locators,
         )
 
-    def _process_type(self, event: dict) -> ProcessedStep:
-        label = event.get("text", "").strip()
+    def _process_type(self, event: dict) -> ProcessedStep | None:
+        """Buffer typing; consecutive events on the same field become one step.
+
+        Returns the previous field's step once typing moves to another field.
+        """
+        label = event["_text"]
         value = event.get("value", "")
         is_password = event.get("is_password", False)
 
         target = label if label else event.get("selector", "input")
+        value = "{{password}}" if is_password else value
+
+        pending = self._pending_type
+        if pending and pending.target == target and pending.is_credential == is_password:
+            pending.value = value  # the latest event carries the full field value
+            return None
+
         desc = f'Type in "{target}"'
         if is_password:
             desc += " (password)"
 
-        return ProcessedStep(
+        self._pending_type = ProcessedStep(
             action="type",
             target=target,
-            value="{{password}}" if is_password else value,
+            value=value,
             description=desc,
             is_credential=is_password,
         )
+        return pending
 
     def _process_select(self, event: dict) -> ProcessedStep:
-        label = event.get("text", "").strip()
+        label = event["_text"]
         value = event.get("value", "")
         target = label if label else event.get("selector", "select")
 
@@ -248,7 +290,7 @@ class RecorderEventProcessor:
         )
 
     def _process_hover(self, event: dict) -> ProcessedStep:
-        text = event.get("text", "").strip()
+        text = event["_text"]
         target = text if text else event.get("selector", "")
         return ProcessedStep(
             action="hover",
@@ -281,9 +323,27 @@ class RecorderEventProcessor:
             confidence=0.4,
         )
 
-    def get_all_steps(self) -> list[ProcessedStep]:
-        """Return all processed steps so far, flushing any pending events."""
-        flushed = self._flush_pending_click()
-        if flushed:
-            self.steps.append(flushed)
-        return self.steps.copy()
+    # Event type → handler, called as handler(self, event)
+    _HANDLERS = {
+        "navigate": _process_navigate,
+        "click": _process_click,
+        "type": _process_type,
+        "select": _process_select,
+        "scroll": _process_scroll,
+        "hover": _process_hover,
+    }
+
+    def get_all_steps(self) -> Sequence[ProcessedStep]:
+        """Return all processed steps so far, flushing any pending events.
+
+        Returns the processor's own list without copying; callers must treat
+        it as read-only and copy it themselves if they need a snapshot.
+        """
+        for flushed in (self._flush_pending_click(), self._flush_pending_type()):
+            if flushed:
+                self.steps.append(flushed)
+        return self.steps
+
+    def iter_steps(self) -> Iterator[ProcessedStep]:
+        """Iterate the steps processed so far without flushing pending events."""
+        return iter(self.steps)
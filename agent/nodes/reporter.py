@@ -1,20 +1,42 @@
 """Report generation node - summarizes test results."""
 
-from langchain_core.prompts import ChatPromptTemplate
+import asyncio
+import hashlib
+import json
+import os
+from typing import Optional
+
+from cachetools import TTLCache
 from agent.llm import get_llm
-from langchain_core.messages import AIMessage
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableConfig
 
 from agent.state import AgentState
+from agent.utils.errors import normalize_error
 from core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Exact-match cache of report text keyed by a hash of the prompt inputs.
+# REPORTER_CACHE_TTL (seconds) controls expiry; 0 disables the cache.
+_REPORT_CACHE_TTL = int(os.getenv("REPORTER_CACHE_TTL", "3600"))
+_report_cache: TTLCache = TTLCache(maxsize=1024, ttl=max(_REPORT_CACHE_TTL, 1))
+
+# Opt-in near-duplicate cache keyed by the run's signature: outcome, action and
+# status sequence and normalized errors, ignoring timings. Reruns of the same
+# scenario reuse the earlier summary (which may quote that run's durations).
+_SEMANTIC_CACHE_ENABLED = os.getenv("REPORTER_SEMANTIC_CACHE", "false").lower() == "true"
+_signature_cache: TTLCache = TTLCache(maxsize=1024, ttl=max(_REPORT_CACHE_TTL, 1))
 
-REPORTER_PROMPT = ChatPromptTemplate.from_messages([
-    ("system", """You are a QA test reporter. Summarize the test execution results in a clear, concise way.
+# Shared read-only stand-in for results whose step_number has no plan step
+_EMPTY: dict = {}
 
-Test Plan: {test_plan}
-Results: {results}
+
+# Static instructions form the system message so the prompt prefix is
+# identical across reports; the per-run plan and results go in the human turn.
+# Messages are built directly rather than through a ChatPromptTemplate, since
+# the only substitution is two values into the human turn.
+REPORTER_SYSTEM_MESSAGE = SystemMessage(content="""You are a QA test reporter. Summarize the test execution results in a clear, concise way.
 
 Provide:
 1. Overall status (PASSED/FAILED)
@@ -23,53 +45,176 @@ Provide:
 4. Any errors encountered
 5. Recommendations if the test failed
 
-Be conversational and helpful."""),
-    ("human", "Generate the test report.")
-])
+Be conversational and helpful.""")
 
 
-async def generate_report(state: AgentState) -> dict:
-    """Generate a summary report of test execution."""
-    logger.info("Generating test report")
+def _build_messages(inputs: dict) -> list[BaseMessage]:
+    """Render the reporter prompt for one run's inputs."""
+    return [
+        REPORTER_SYSTEM_MESSAGE,
+        HumanMessage(content=(
+            f"Test Plan: {inputs['test_plan']}\n"
+            f"Results: {inputs['results']}\n\n"
+            "Generate the test report."
+        )),
+    ]
+
+
+def _report_cache_key(inputs: dict) -> str:
+    """Hash the canonical JSON form of the reporter prompt inputs."""
+    canonical = json.dumps(inputs, sort_keys=True, default=str)
+    return hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
+
 
-    model = get_llm("fast")
+def _report_signature(inputs: dict, overall_status: str) -> str:
+    """Hash what makes two runs equivalent for reporting, ignoring timings."""
+    plan = inputs["test_plan"]
+    signature = [plan["query"], plan["expected_outcome"], overall_status]
+    for r in inputs["results"]:
+        signature.append(f"{r['action']}|{r['status']}|{normalize_error(r['error'])}")
+    return hashlib.blake2b("\n".join(signature).encode(), digest_size=16).hexdigest()
 
+
+async def _persist_results(persist, test_results: list) -> None:
+    """Run a sync persistence callable in a worker thread, logging failures."""
+    try:
+        await asyncio.to_thread(persist, test_results)
+    except Exception as e:
+        logger.error(f"Failed to persist test results: {e}")
+
+
+def _build_prompt_inputs(state: AgentState) -> tuple[dict, str]:
+    """Build the reporter prompt inputs and overall status for one run."""
     test_plan = state.get("test_plan", {})
     test_results = state.get("test_results", [])
 
-    # Calculate overall status
-    failed_steps = [r for r in test_results if r.get("status") == "failed"]
-    overall_status = "failed" if failed_steps else "passed"
+    steps = test_plan.get("steps", []) or []
+    n_steps = len(steps)
 
-    # Format results for the prompt
+    # Format results for the prompt, noting any failure on the way
+    failed = False
     formatted_results = []
     for result in test_results:
+        status = result.get("status", "unknown")
+        if status == "failed":
+            failed = True
         step_num = result.get("step_number", 0)
-        step_info = test_plan.get("steps", [])[step_num] if step_num < len(test_plan.get("steps", [])) else {}
+        step_info = steps[step_num] if step_num < n_steps else _EMPTY
         formatted_results.append({
             "step": step_num + 1,
             "action": step_info.get("action", "unknown"),
             "description": step_info.get("description", ""),
-            "status": result.get("status", "unknown"),
+            "status": status,
             "duration_ms": result.get("duration_ms", 0),
             "error": result.get("error"),
         })
+    overall_status = "failed" if failed else "passed"
 
-    chain = REPORTER_PROMPT | model
-
-    response = await chain.ainvoke({
+    inputs = {
         "test_plan": {
             "query": test_plan.get("natural_query", ""),
             "expected_outcome": test_plan.get("expected_outcome", ""),
-            "total_steps": len(test_plan.get("steps", [])),
+            "total_steps": n_steps,
         },
         "results": formatted_results,
-    })
+    }
+    return inputs, overall_status
+
 
-    logger.info(f"Report generated: {overall_status.upper()}, {len(test_results)} steps executed")
+def _cache_keys(inputs: dict, overall_status: str) -> tuple[Optional[str], Optional[str]]:
+    """Return the (exact, signature) cache keys, None where that cache is off."""
+    if _REPORT_CACHE_TTL <= 0:
+        return None, None
+    signature_key = _report_signature(inputs, overall_status) if _SEMANTIC_CACHE_ENABLED else None
+    return _report_cache_key(inputs), signature_key
 
+
+def _cached_summary(cache_key: Optional[str], signature_key: Optional[str]) -> Optional[str]:
+    """Look up a cached summary, trying the exact key before the signature."""
+    summary = _report_cache.get(cache_key) if cache_key else None
+    if summary is None and signature_key:
+        summary = _signature_cache.get(signature_key)
+    return summary
+
+
+def _store_summary(cache_key: Optional[str], signature_key: Optional[str], summary: str) -> None:
+    if cache_key:
+        _report_cache[cache_key] = summary
+    if signature_key:
+        _signature_cache[signature_key] = summary
+
+
+def _report_output(summary: str, overall_status: str) -> dict:
     return {
-        "messages": [AIMessage(content=response.content)],
-        "summary": response.content,
+        "messages": [AIMessage(content=summary)],
+        "summary": summary,
         "final_status": overall_status,
     }
+
+
+async def generate_report(state: AgentState, config: Optional[RunnableConfig] = None) -> dict:
+    """Generate a summary report of test execution.
+
+    If the graph is invoked with a ``persist_results`` callable in
+    ``config["configurable"]``, it is called with the test results in a
+    worker thread while the report is being generated. The LLM response is
+    streamed, so token chunks reach ``stream_mode="messages"`` consumers
+    before the node returns.
+    """
+    logger.info("Generating test report")
+
+    test_results = state.get("test_results", [])
+
+    # Overlap result persistence (DB writes) with the LLM round-trip
+    persist = ((config or {}).get("configurable") or {}).get("persist_results")
+    persist_task = asyncio.create_task(_persist_results(persist, test_results)) if persist else None
+
+    inputs, overall_status = _build_prompt_inputs(state)
+
+    try:
+        cache_key, signature_key = _cache_keys(inputs, overall_status)
+        summary = _cached_summary(cache_key, signature_key)
+
+        if summary is not None:
+            logger.info(f"Report cache hit: {overall_status.upper()}, {len(test_results)} steps executed")
+        else:
+            # Stream so graph runs using stream_mode="messages" see tokens as
+            # they arrive; the config carries the graph's callbacks.
+            parts = []
+            async for chunk in get_llm("fast").astream(_build_messages(inputs), config):
+                parts.append(chunk.content)
+            summary = "".join(parts)
+            _store_summary(cache_key, signature_key, summary)
+            logger.info(f"Report generated: {overall_status.upper()}, {len(test_results)} steps executed")
+    finally:
+        if persist_task:
+            await persist_task
+
+    return _report_output(summary, overall_status)
+
+
+async def generate_reports_batch(states: list[AgentState]) -> list[dict]:
+    """Generate reports for several finished runs with one batched LLM call.
+
+    Cached reports are reused; the remaining prompts go through
+    ``abatch`` so the provider calls run concurrently. Results are
+    returned in the same order as ``states``.
+    """
+    logger.info(f"Generating {len(states)} test reports")
+
+    built = [_build_prompt_inputs(state) for state in states]
+    keys = [_cache_keys(inputs, status) for inputs, status in built]
+    summaries = [_cached_summary(*k) for k in keys]
+
+    misses = [i for i, summary in enumerate(summaries) if summary is None]
+    if misses:
+        responses = await get_llm("fast").abatch([_build_messages(built[i][0]) for i in misses])
+        for i, response in zip(misses, responses):
+            summaries[i] = response.content
+            _store_summary(*keys[i], response.content)
+
+    logger.info(f"Reports generated: {len(misses)} from LLM, {len(states) - len(misses)} from cache")
+    return [
+        _report_output(summary, status)
+        for summary, (_, status) in zip(summaries, built)
+    ]
@@ -0,0 +1,16 @@
+"""Helpers for comparing step error messages."""
+
+import re
+from typing import Optional
+
+# Numbers in errors (timeouts, ports, coordinates) vary between runs
+_NUMBER_RE = re.compile(r"\d+")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_error(error: Optional[str]) -> str:
+    """Normalize an error message so repeats of the same failure compare equal."""
+    if not error:
+        return ""
+    normalized = _NUMBER_RE.sub("#", error.lower())
+    return _WHITESPACE_RE.sub(" ", normalized).strip()
@@ -1,19 +1,186 @@
 """Reference resolution for personas, pages, and test data in test steps."""
 
-import json
+import asyncio
 import logging
 import re
+from dataclasses import dataclass
+from functools import lru_cache
+from threading import Lock
 from typing import Dict, Any, List, Optional, Tuple
+
+import orjson
+from cachetools import TTLCache
+from sqlalchemy import event as sa_event
 from sqlmodel import Session
 
 from db import crud
 from db.encryption import decrypt_password, decrypt_data
+from db.models import Page, Persona, Project, TestData
+from db.session import engine
 
 logger = logging.getLogger(__name__)
 
 # Pattern to detect password placeholders
 PASSWORD_PATTERN = r"\{\{\w+\.password\}\}"
 
+# Matches {{word}}, {{word.word}}, or {{word.word.word}}
+_REF_RE = re.compile(r"\{\{(\w+(?:\.\w+(?:\.\w+)?)?)\}\}")
+
+# Matches {{env.VAR}}; substituted in a first pass straight from env_vars
+_ENV_REF_RE = re.compile(r"\{\{env\.(\w+)\}\}")
+
+
+@dataclass(frozen=True, slots=True)
+class _PersonaRef:
+    """Persona fields used for resolution; secrets stay encrypted until used."""
+    username: Optional[str]
+    encrypted_password: Optional[str]
+    encrypted_api_key: Optional[str]
+    encrypted_token: Optional[str]
+    encrypted_metadata: Optional[str]
+
+
+@dataclass(frozen=True, slots=True)
+class _ProjectRefs:
+    """Snapshot of everything references can resolve to for a project/environment."""
+    base_url: str
+    personas: Dict[str, _PersonaRef]
+    pages: Dict[str, str]          # page name -> path
+    test_data: Dict[str, str]      # dataset name -> raw JSON
+
+
+# Snapshots keyed by (project_id, environment_id). Entries for a project are
+# dropped when its project, persona, page or test data rows change; the TTL
+# bounds staleness for bulk statements that bypass ORM events.
+_refs_cache: TTLCache = TTLCache(maxsize=256, ttl=60)
+_refs_lock = Lock()
+
+
+def _invalidate_project_refs(mapper, connection, target) -> None:
+    """ORM event hook: forget cached references for the changed row's project."""
+    project_id = target.id if isinstance(target, Project) else target.project_id
+    with _refs_lock:
+        for key in [k for k in _refs_cache if k[0] == project_id]:
+            _refs_cache.pop(key, None)
+
+
+for _model in (Project, Persona, Page, TestData):
+    for _event_name in ("after_insert", "after_update", "after_delete"):
+        sa_event.listen(_model, _event_name, _invalidate_project_refs)
+
+
+def _build_project_refs(
+    project: Optional[Project],
+    pages: List[Page],
+    personas: List[Persona],
+    test_data: List[TestData],
+    environment_id: Optional[int],
+) -> _ProjectRefs:
+    """Build a snapshot from loaded rows; env-scoped items override globals."""
+    if environment_id is not None:
+        persona_rows = {p.name: p for p in personas if p.environment_id is None}
+        persona_rows.update({p.name: p for p in personas if p.environment_id == environment_id})
+        td_rows = {td.name: td for td in test_data if td.environment_id is None}
+        td_rows.update({td.name: td for td in test_data if td.environment_id == environment_id})
+    else:
+        persona_rows = {p.name: p for p in personas}
+        td_rows = {td.name: td for td in test_data}
+
+    return _ProjectRefs(
+        base_url=(project.base_url if project else "") or "",
+        personas={
+            name: _PersonaRef(
+                username=p.username,
+                encrypted_password=p.encrypted_password,
+                encrypted_api_key=p.encrypted_api_key,
+                encrypted_token=p.encrypted_token,
+                encrypted_metadata=p.encrypted_metadata,
+            )
+            for name, p in persona_rows.items()
+        },
+        pages={p.name: p.path for p in pages},
+        test_data={name: td.data for name, td in td_rows.items()},
+    )
+
+
+def _load_project_refs(
+    session: Session,
+    project_id: int,
+    environment_id: Optional[int],
+) -> _ProjectRefs:
+    """Load personas, pages and test data for a project/environment."""
+    return _build_project_refs(
+        crud.get_project(session, project_id),
+        crud.get_pages_by_project(session, project_id),
+        crud.get_personas_by_project(session, project_id, environment_id),
+        crud.get_test_data_by_project(session, project_id, environment_id),
+        environment_id,
+    )
+
+
+async def _load_project_refs_async(
+    project_id: int,
+    environment_id: Optional[int],
+) -> _ProjectRefs:
+    """Like _load_project_refs, but runs the four queries concurrently.
+
+    Each query gets its own session in a worker thread, so the total wait is
+    the slowest query rather than the sum of all four.
+    """
+    def query(fn, *args):
+        with Session(engine) as session:
+            return fn(session, *args)
+
+    project, pages, personas, test_data = await asyncio.gather(
+        asyncio.to_thread(query, crud.get_project, project_id),
+        asyncio.to_thread(query, crud.get_pages_by_project, project_id),
+        asyncio.to_thread(query, crud.get_personas_by_project, project_id, environment_id),
+        asyncio.to_thread(query, crud.get_test_data_by_project, project_id, environment_id),
+    )
+    return _build_project_refs(project, pages, personas, test_data, environment_id)
+
+
+def _get_project_refs(
+    session: Session,
+    project_id: int,
+    environment_id: Optional[int],
+) -> _ProjectRefs:
+    """Return the cached reference snapshot, loading it on a miss."""
+    key = (project_id, environment_id)
+    with _refs_lock:
+        refs = _refs_cache.get(key)
+    if refs is None:
+        refs = _load_project_refs(session, project_id, environment_id)
+        with _refs_lock:
+            _refs_cache[key] = refs
+    return refs
+
+
+async def _get_project_refs_async(
+    project_id: int,
+    environment_id: Optional[int],
+) -> _ProjectRefs:
+    """Async counterpart of _get_project_refs sharing the same cache."""
+    key = (project_id, environment_id)
+    with _refs_lock:
+        refs = _refs_cache.get(key)
+    if refs is None:
+        refs = await _load_project_refs_async(project_id, environment_id)
+        with _refs_lock:
+            _refs_cache[key] = refs
+    return refs
+
+
+def _needs_resolution(steps: List[Dict[str, Any]]) -> bool:
+    """Whether any step has a {{reference}} or a relative navigate URL."""
+    for step in steps:
+        for value in step.values():
+            if isinstance(value, str) and "{{" in value:
+                return True
+        if step.get("action") == "navigate" and (step.get("value") or "").startswith("/"):
+            return True
+    return False
+
 
 def mask_passwords_in_steps(
     steps: List[Dict[str, Any]],
@@ -24,33 +191,49 @@ def mask_passwords_in_steps(
 
     This should be called AFTER resolve_references to mask the actual
     password values before storing in database or sending to frontend.
+    Steps that need no masking are returned as the same dict objects, so
+    treat the result as read-only.
     """
     masked_steps = []
     for step in steps:
-        masked_step = dict(step)
-        # Check if this step likely contains a password (from fill_form or type actions)
-        value = masked_step.get("value", "")
-        if isinstance(value, str):
+        # Steps without a password are passed through as-is; only masked steps are copied
+        if _has_password(step):
             # For fill_form with JSON, mask password fields
-            if step.get("action") == "fill_form" and value.startswith("{"):
+            if step.get("action") == "fill_form":
                 try:
-                    import json
-                    form_data = json.loads(value)
+                    form_data = orjson.loads(step["value"])
                     for key in form_data:
                         if "password" in key.lower():
                             form_data[key] = mask
-                    masked_step["value"] = json.dumps(form_data)
-                except (json.JSONDecodeError, TypeError):
+                    step = {**step, "value": orjson.dumps(form_data).decode()}
+                except (orjson.JSONDecodeError, TypeError):
                     pass
             # For type action targeting password fields
-            elif step.get("action") == "type":
-                target = (step.get("target") or "").lower()
-                if "password" in target:
-                    masked_step["value"] = mask
-        masked_steps.append(masked_step)
+            else:
+                step = {**step, "value": mask}
+        masked_steps.append(step)
     return masked_steps
 
 
+def _has_password(step: Dict[str, Any]) -> bool:
+    """Whether a step likely contains a password (from fill_form or type actions)."""
+    value = step.get("value", "")
+    if not isinstance(value, str):
+        return False
+    action = step.get("action")
+    if action == "fill_form":
+        return value.startswith("{") and "password" in value.lower()
+    return action == "type" and "password" in (step.get("target") or "").lower()
+
+
+def has_password_steps(steps: List[Dict[str, Any]]) -> bool:
+    """Whether mask_passwords_in_steps would mask any of the steps.
+
+    Lets callers skip building a masked copy when nothing needs masking.
+    """
+    return any(_has_password(step) for step in steps)
+
+
 def resolve_references(
     session: Session,
     project_id: int,
@@ -78,32 +261,60 @@ def resolve_references(
         override_base_url: Optional base_url from active environment (overrides project base_url)
 
     Returns:
-        List of steps with all references resolved
+        List of steps with all references resolved. Steps with nothing to
+        resolve are the input dicts themselves, so treat them as read-only;
+        static plans skip the lookups entirely.
     """
-    # Load project for base_url; env override takes priority
-    project = crud.get_project(session, project_id)
-    base_url = (override_base_url or (project.base_url if project else "") or "").rstrip("/")
-    _env_vars = env_vars or {}
+    if not _needs_resolution(steps):
+        return list(steps)
+    refs = _get_project_refs(session, project_id, environment_id)
+    return _resolve_steps(refs, steps, env_vars, override_base_url)
 
-    # Load personas and test data — env-scoped items override globals with the same name
-    pages = {p.name: p for p in crud.get_pages_by_project(session, project_id)}
 
-    if environment_id is not None:
-        all_personas = crud.get_personas_by_project(session, project_id, environment_id)
-        personas: Dict[str, Any] = {p.name: p for p in all_personas if p.environment_id is None}
-        personas.update({p.name: p for p in all_personas if p.environment_id == environment_id})
-        all_td = crud.get_test_data_by_project(session, project_id, environment_id)
-        test_data_items: Dict[str, Any] = {td.name: td for td in all_td if td.environment_id is None}
-        test_data_items.update({td.name: td for td in all_td if td.environment_id == environment_id})
-    else:
-        personas = {p.name: p for p in crud.get_personas_by_project(session, project_id)}
-        test_data_items = {td.name: td for td in crud.get_test_data_by_project(session, project_id)}
+async def resolve_references_async(
+    project_id: int,
+    steps: List[Dict[str, Any]],
+    env_vars: Optional[Dict[str, str]] = None,
+    override_base_url: Optional[str] = None,
+    environment_id: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Async variant of resolve_references for use on the event loop.
 
-    # Pattern matches {{word}}, {{word.word}}, or {{word.word.word}}
-    pattern = r"\{\{(\w+(?:\.\w+(?:\.\w+)?)?)\}\}"
+    On a cache miss the project, page, persona and test data queries run
+    concurrently in worker threads, each with its own session, instead of
+    blocking the loop one after another.
+    """
+    if not _needs_resolution(steps):
+        return list(steps)
+    refs = await _get_project_refs_async(project_id, environment_id)
+    return _resolve_steps(refs, steps, env_vars, override_base_url)
 
-    def replace(match: re.Match) -> str:
-        ref = match.group(1)
+
+def _resolve_steps(
+    refs: _ProjectRefs,
+    steps: List[Dict[str, Any]],
+    env_vars: Optional[Dict[str, str]],
+    override_base_url: Optional[str],
+) -> List[Dict[str, Any]]:
+    """Resolve references in steps against a project snapshot."""
+    personas = refs.personas
+    pages = refs.pages
+    test_data_items = refs.test_data
+
+    # Env override takes priority over the project base_url
+    base_url = (override_base_url or refs.base_url).rstrip("/")
+    _env_vars = env_vars or {}
+
+    # Each distinct reference is resolved once per call, and each ciphertext
+    # decrypted once (custom metadata fields of a persona share one blob)
+    resolved: Dict[str, str] = {}
+    _decrypt_password = lru_cache(maxsize=None)(decrypt_password)
+    _decrypt_data = lru_cache(maxsize=None)(decrypt_data)
+    _parse_json = lru_cache(maxsize=None)(orjson.loads)
+
+    def resolve_ref(ref: str) -> str:
+        """Resolve one reference, returning it unchanged if it can't be resolved."""
+        original = f"{{{{{ref}}}}}"
         parts = ref.split(".")
 
         if len(parts) == 3:
@@ -111,18 +322,18 @@ def resolve_references(
             prefix, dataset_name, field = parts
             if prefix == "data" and dataset_name in test_data_items:
                 try:
-                    parsed = json.loads(test_data_items[dataset_name].data)
+                    parsed = _parse_json(test_data_items[dataset_name])
                     if isinstance(parsed, dict) and field in parsed:
                         return str(parsed[field])
-                except (json.JSONDecodeError, TypeError) as e:
+                except (orjson.JSONDecodeError, TypeError) as e:
                     logger.warning(f"Failed to parse test data '{dataset_name}': {e}")
-            return match.group(0)
+            return original
 
         elif len(parts) == 2:
             # 2-part: {{env.VAR}} for environment variables
             name, field = parts
             if name == "env":
-                return str(_env_vars.get(field, match.group(0)))
+                return str(_env_vars.get(field, original))
 
             # 2-part: {{name.field}} for persona/credential
             if name in personas:
@@ -132,56 +343,80 @@ def resolve_references(
                 elif field == "password":
                     try:
                         if persona.encrypted_password:
-                            return decrypt_password(persona.encrypted_password)
+                            return _decrypt_password(persona.encrypted_password)
                     except Exception as e:
                         logger.warning(f"Failed to decrypt password for '{name}': {e}")
-                    return match.group(0)
+                    return original
                 elif field == "api_key":
                     try:
                         if persona.encrypted_api_key:
-                            return decrypt_data(persona.encrypted_api_key)
+                            return _decrypt_data(persona.encrypted_api_key)
                     except Exception as e:
                         logger.warning(f"Failed to decrypt api_key for '{name}': {e}")
-                    return match.group(0)
+                    return original
                 elif field == "token":
                     try:
                         if persona.encrypted_token:
-                            return decrypt_data(persona.encrypted_token)
+                            return _decrypt_data(persona.encrypted_token)
                     except Exception as e:
                         logger.warning(f"Failed to decrypt token for '{name}': {e}")
-                    return match.group(0)
+                    return original
                 else:
                     # Try custom metadata field
                     try:
                         if persona.encrypted_metadata:
-                            metadata = json.loads(decrypt_data(persona.encrypted_metadata))
+                            metadata = _parse_json(_decrypt_data(persona.encrypted_metadata))
                             if isinstance(metadata, dict) and field in metadata:
                                 return str(metadata[field])
                     except Exception as e:
                         logger.warning(f"Failed to decrypt metadata for '{name}': {e}")
-            return match.group(0)
+            return original
 
         else:
             # 1-part: {{name}} for page reference
             if ref in pages:
-                return pages[ref].path
-            return match.group(0)
+                return pages[ref]
+            return original
+
+    def replace(match: re.Match) -> str:
+        ref = match.group(1)
+        value = resolved.get(ref)
+        if value is None:
+            value = resolved[ref] = resolve_ref(ref)
+        return value
+
+    def replace_env(match: re.Match) -> str:
+        return str(_env_vars.get(match.group(1), match.group(0)))
 
     def resolve_value(value: Any) -> Any:
         """Resolve references in a value if it's a string."""
-        if isinstance(value, str):
-            return re.sub(pattern, replace, value)
-        return value
+        if not isinstance(value, str) or "{{" not in value:
+            return value
+        # Values holding only env refs skip the general resolver. Mixed values
+        # go through it from the original text so substituted env values are
+        # never re-scanned for references.
+        if _env_vars and "{{env." in value:
+            substituted = _ENV_REF_RE.sub(replace_env, value)
+            if "{{" not in substituted:
+                return substituted
+        return _REF_RE.sub(replace, value)
 
-    # Process each step
+    # Process each step; steps with nothing to substitute are reused as-is
     resolved_steps = []
     for step in steps:
+        is_navigate = step.get("action") == "navigate"
+        if not is_navigate and not any(
+            isinstance(v, str) and "{{" in v for v in step.values()
+        ):
+            resolved_steps.append(step)
+            continue
+
         resolved_step = {
             k: resolve_value(v) for k, v in step.items()
         }
 
         # Handle relative URLs for navigate action
-        if resolved_step.get("action") == "navigate":
+        if is_navigate:
             url = resolved_step.get("value", "")
             if url and url.startswith("/") and base_url:
                 resolved_step["value"] = base_url + url
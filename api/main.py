@@ -1,7 +1,5 @@
 """FastAPI application for the QA Testing Agent API."""
 
-import time
-import uuid
 from contextlib import asynccontextmanager
 
 from dotenv import load_dotenv
@@ -9,10 +7,16 @@ from dotenv import load_dotenv
 # Load .env file before any other imports that read env vars
 load_dotenv()
 
-from fastapi import FastAPI, Request
+import orjson
+from fastapi import APIRouter, FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 
-from core.logging import setup_logging, get_logger, request_id_var
+from core.config import RUN_SCHEDULER, WEB_CONCURRENCY
+from core.logging import setup_logging, get_logger
+from api.middleware.cors_preflight import CORSPreflightMiddleware
+from api.middleware.request_log import RequestLogMiddleware
 from db.session import create_db_and_tables
 from api.routes import projects, test_cases, test_runs, agent, settings, config, notifications, schedules, fixtures, folders, environments, vault, recorder, healer, executor
 
@@ -27,15 +31,24 @@ async def lifespan(app: FastAPI):
     from scheduler import scheduler_service
 
     logger.info("Starting QA Testing Agent API")
+    if WEB_CONCURRENCY > 1:
+        logger.warning(
+            f"WEB_CONCURRENCY={WEB_CONCURRENCY} is not supported: recordings and "
+            "reference caches are per process and are not shared between workers"
+        )
     create_db_and_tables()
 
-    # Start the scheduler service
-    await scheduler_service.start()
+    # Start the scheduler service (one process only, see RUN_SCHEDULER)
+    if RUN_SCHEDULER:
+        await scheduler_service.start()
+    else:
+        logger.info("Scheduler disabled in this process (RUN_SCHEDULER=false)")
 
     yield
 
     # Stop the scheduler service
     await scheduler_service.stop()
+    await executor.close_client()
     logger.info("Shutting down QA Testing Agent API")
 
 
@@ -45,65 +58,75 @@ app = FastAPI(
     version="0.1.0",
     lifespan=lifespan,
     redirect_slashes=False,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware — must be outermost so it adds headers to all responses
 # including SSE streams and error responses.
+_CORS_ORIGINS = ["http://localhost:3000", "http://localhost:3001"]
+_CORS_MAX_AGE = 86400  # let browsers cache preflight responses for a day
+
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["http://localhost:3000", "http://localhost:3001"],
+    allow_origins=_CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    max_age=_CORS_MAX_AGE,
+)
+
+# Compress JSON responses of 1KB or more. Level 5 is much cheaper than the
+# default 9 for nearly the same ratio; SSE streams are never compressed.
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
+# Allowed preflights are answered before reaching CORSMiddleware
+app.add_middleware(CORSPreflightMiddleware, allow_origins=_CORS_ORIGINS, max_age=_CORS_MAX_AGE)
+
+# Request logging wraps CORS so preflights and CORS errors are logged too
+app.add_middleware(RequestLogMiddleware)
+
+# Include routers: everything is mounted once under a single /api router
+_ROUTERS = (
+    projects.router,
+    test_cases.router,
+    test_runs.router,
+    agent.router,
+    settings.router,
+    config.router,
+    notifications.router,
+    schedules.router,
+    schedules.project_runs_router,
+    fixtures.router,
+    fixtures.fixture_router,
+    folders.router,
+    environments.router,
+    vault.router,
+    recorder.router,
+    healer.router,
+    executor.router,
 )
+api_router = APIRouter(prefix="/api")
+for _router in _ROUTERS:
+    api_router.include_router(_router)
+# Scheduler diagnostics stay routable but out of the OpenAPI docs
+api_router.include_router(schedules.debug_router, include_in_schema=False)
+app.include_router(api_router)
 
-# Include routers
-app.include_router(projects.router, prefix="/api")
-app.include_router(test_cases.router, prefix="/api")
-app.include_router(test_runs.router, prefix="/api")
-app.include_router(agent.router, prefix="/api")
-app.include_router(settings.router, prefix="/api")
-app.include_router(config.router, prefix="/api")
-app.include_router(notifications.router, prefix="/api")
-app.include_router(schedules.router, prefix="/api")
-app.include_router(schedules.project_runs_router, prefix="/api")
-app.include_router(schedules.debug_router, prefix="/api")
-app.include_router(fixtures.router, prefix="/api")
-app.include_router(fixtures.fixture_router, prefix="/api")
-app.include_router(folders.router, prefix="/api")
-app.include_router(environments.router, prefix="/api")
-app.include_router(vault.router, prefix="/api")
-app.include_router(recorder.router, prefix="/api")
-app.include_router(healer.router, prefix="/api")
-app.include_router(executor.router, prefix="/api")
+
+# Static bodies are serialized once. A fresh Response is still built per call:
+# middleware such as CORS appends to the headers list of the response it sends.
+_ROOT_BODY = orjson.dumps({"name": "QA Testing Agent", "version": "0.1.0"})
+_HEALTH_BODY = orjson.dumps({"status": "healthy"})
 
 
 @app.get("/")
 def read_root():
     """Root endpoint."""
-    return {"name": "QA Testing Agent", "version": "0.1.0"}
+    return Response(content=_ROOT_BODY, media_type="application/json")
 
 
 @app.get("/health")
 def health_check():
     """Health check endpoint."""
-    return {"status": "healthy"}
-
-
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    """Log all HTTP requests with request ID for correlation."""
-    request_id = str(uuid.uuid4())
-    request_id_var.set(request_id)
-
-    start = time.perf_counter()
-    logger.info(f"{request.method} {request.url.path}")
-
-    response = await call_next(request)
-
-    duration_ms = (time.perf_counter() - start) * 1000
-    logger.info(f"{response.status_code} ({duration_ms:.1f}ms)")
-
-    response.headers["X-Request-ID"] = request_id
+    return Response(content=_HEALTH_BODY, media_type="application/json")
 
-    return response
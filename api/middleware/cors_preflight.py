@@ -0,0 +1,54 @@
+"""Fast path for CORS preflight requests."""
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Matches CORSMiddleware with allow_methods=["*"]
+_ALLOW_METHODS = ("DELETE", "GET", "HEAD", "OPTIONS", "PATCH", "POST", "PUT")
+
+
+class CORSPreflightMiddleware:
+    """Answer allowed CORS preflights with a canned response.
+
+    Sits in front of CORSMiddleware and replies to OPTIONS preflights from
+    allowed origins without building a Response object. The headers match
+    what CORSMiddleware sends for allow_methods=["*"], allow_headers=["*"] and
+    allow_credentials=True. Every other request, including preflights that
+    should be rejected, falls through to CORSMiddleware.
+    """
+
+    def __init__(self, app: ASGIApp, allow_origins: list[str], max_age: int = 600) -> None:
+        self.app = app
+        self.allow_origins = frozenset(allow_origins)
+        self.allow_methods = frozenset(_ALLOW_METHODS)
+        self.static_headers = [
+            (b"vary", b"Origin"),
+            (b"access-control-allow-methods", ", ".join(_ALLOW_METHODS).encode()),
+            (b"access-control-max-age", str(max_age).encode()),
+            (b"access-control-allow-credentials", b"true"),
+            (b"content-length", b"2"),
+            (b"content-type", b"text/plain; charset=utf-8"),
+        ]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        origin = headers.get("origin")
+        if (
+            origin not in self.allow_origins
+            or headers.get("access-control-request-method") not in self.allow_methods
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        response_headers = [*self.static_headers, (b"access-control-allow-origin", origin.encode("latin-1"))]
+        requested_headers = headers.get("access-control-request-headers")
+        if requested_headers is not None:
+            # allow_headers=["*"]: mirror whatever the browser asked for
+            response_headers.append((b"access-control-allow-headers", requested_headers.encode("latin-1")))
+
+        await send({"type": "http.response.start", "status": 200, "headers": response_headers})
+        await send({"type": "http.response.body", "body": b"OK"})
@@ -0,0 +1,65 @@
+"""Request logging middleware with request ID propagation."""
+
+import logging
+import time
+import uuid
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.logging import get_logger, request_id_var
+
+logger = get_logger(__name__)
+
+# Probe and static paths are logged at DEBUG so liveness checks don't flood logs
+_QUIET_PREFIXES = ("/health", "/metrics", "/static")
+
+
+class RequestLogMiddleware:
+    """Log each HTTP request and tag its response with an X-Request-ID header.
+
+    A pure ASGI middleware rather than ``@app.middleware("http")``: Starlette's
+    BaseHTTPMiddleware runs every request in an extra task and wraps the
+    response, which this only needs to add one header and time the request.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = uuid.uuid4().hex
+        request_id_var.set(request_id)
+        header_value = request_id.encode("latin-1")
+
+        path = scope["path"]
+        level = logging.DEBUG if path.startswith(_QUIET_PREFIXES) else logging.INFO
+        log = logger.isEnabledFor(level)
+
+        start = time.perf_counter()
+        if log:
+            logger.log(level, f"{scope['method']} {path}")
+
+        log_body = logger.isEnabledFor(logging.DEBUG)
+        bytes_sent = 0
+
+        # Messages are forwarded as they arrive, so streamed (SSE) responses
+        # are never buffered. The status line is logged at response start;
+        # the body size once the last chunk has been sent.
+        async def send_wrapper(message: Message) -> None:
+            nonlocal bytes_sent
+            if message["type"] == "http.response.start":
+                if log:
+                    duration_ms = (time.perf_counter() - start) * 1000
+                    logger.log(level, f"{message['status']} ({duration_ms:.1f}ms)")
+                message["headers"] = [*message.get("headers", ()), (b"x-request-id", header_value)]
+            elif message["type"] == "http.response.body" and log_body:
+                bytes_sent += len(message.get("body", b""))
+                if not message.get("more_body", False):
+                    duration_ms = (time.perf_counter() - start) * 1000
+                    logger.debug(f"Sent {bytes_sent} bytes ({duration_ms:.1f}ms)")
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -1,8 +1,9 @@
 """Agent API routes - consolidates LangGraph invocation into FastAPI."""
 
+import json
 import uuid
 from typing import Optional, List, Any
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from pydantic import BaseModel
 from sqlmodel import Session
 from langchain_core.messages import HumanMessage
@@ -10,7 +11,6 @@ from langchain_core.messages import HumanMessage
 from db.session import get_session_dep
 from db.models import Project, TestCaseCreate
 from db import crud
-from agent.graph import graph
 from agent.nodes.builder import build_test_case
 
 
@@ -71,7 +71,16 @@ class BuildResponse(BaseModel):
     needs_clarification: bool = False
 
 
-@router.post("/projects/{project_id}/build", response_model=BuildResponse)
+# BuilderResponse fields sent to the client; the builder's TestCaseModel has
+# the same shape as TestCaseResponse, so its JSON is already a BuildResponse
+_BUILD_RESPONSE_FIELDS = frozenset(BuildResponse.model_fields)
+
+
+@router.post(
+    "/projects/{project_id}/build",
+    response_model=None,
+    responses={200: {"model": BuildResponse}},
+)
 async def build(
     project_id: int,
     request: BuildRequest,
@@ -92,30 +101,8 @@ async def build(
     # 2. Convert request test case to dict for builder
     current_test_case = None
     if request.test_case:
-        current_test_case = {
-            "name": request.test_case.name,
-            "natural_query": request.test_case.natural_query,
-            "priority": request.test_case.priority,
-            "tags": request.test_case.tags or [],
-            "steps": [
-                {
-                    "action": step.action,
-                    "target": step.target,
-                    "value": step.value,
-                    "description": step.description,
-                }
-                for step in (request.test_case.steps or [])
-            ],
-            "original_steps": [
-                {
-                    "action": step.action,
-                    "target": step.target,
-                    "value": step.value,
-                    "description": step.description,
-                }
-                for step in (request.test_case.original_steps or [])
-            ] if request.test_case.original_steps else None
-        }
+        current_test_case = request.test_case.model_dump()
+        current_test_case["tags"] = current_test_case["tags"] or []
 
     # 3. Call the builder
     try:
@@ -130,26 +117,11 @@ async def build(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Builder error: {str(e)}")
 
-    # 4. Convert result to response format
-    return BuildResponse(
-        test_case=TestCaseResponse(
-            name=result.test_case.name,
-            natural_query=result.test_case.natural_query,
-            priority=result.test_case.priority,
-            tags=result.test_case.tags,
-            steps=[
-                TestStepResponse(
-                    action=step.action,
-                    target=step.target,
-                    value=step.value,
-                    description=step.description,
-                )
-                for step in result.test_case.steps
-            ],
-            fixture_ids=result.test_case.fixture_ids,
-        ),
-        message=result.message,
-        needs_clarification=result.needs_clarification,
+    # 4. Serialize the builder result straight to the response shape; its
+    # models were validated when the builder produced them
+    return Response(
+        content=result.model_dump_json(include=_BUILD_RESPONSE_FIELDS),
+        media_type="application/json",
     )
 
 
@@ -182,7 +154,11 @@ class ChatResponse(BaseModel):
     summary: Optional[str] = None
 
 
-@router.post("/projects/{project_id}/chat", response_model=ChatResponse)
+@router.post(
+    "/projects/{project_id}/chat",
+    response_model=None,
+    responses={200: {"model": ChatResponse}},
+)
 async def chat(
     project_id: int,
     request: ChatRequest,
@@ -200,9 +176,10 @@ async def chat(
         raise HTTPException(status_code=404, detail="Project not found")
 
     # 2. Generate or use provided thread_id
-    thread_id = request.thread_id or str(uuid.uuid4())
+    thread_id = request.thread_id or uuid.uuid4().hex
 
     # 3. Build initial state with project context + user message
+    project_config = project.get_config()
     initial_state = {
         "messages": [HumanMessage(content=request.message)],
         # Unified project settings object
@@ -210,19 +187,22 @@ async def chat(
             "id": str(project_id),
             "name": project.name,
             "url": project.base_url,
-            "config": project.get_config() if project.config else {},
+            "config": project_config,
             "base_prompt": project.base_prompt,
         },
         # Legacy fields (for backward compatibility)
         "project_id": str(project_id),
         "project_name": project.name,
         "project_url": project.base_url,
-        "project_config": project.get_config() if project.config else {},
+        "project_config": project_config,
         "current_step": 0,
         "test_results": [],
     }
 
-    # 4. Invoke graph with thread_id for conversation continuity
+    # 4. Invoke graph with thread_id for conversation continuity. The graph
+    # (and LangGraph) is imported on first use to keep API startup light.
+    from agent.graph import graph
+
     config = {"configurable": {"thread_id": thread_id}}
 
     try:
@@ -239,30 +219,32 @@ async def chat(
     summary = result.get("summary")
     generated_test_cases_raw = result.get("generated_test_cases", [])
 
-    # 6. If test cases were generated, save them to the database
+    # 6. If test cases were generated, save them to the database in one transaction
     saved_test_cases = []
     if generated_test_cases_raw:
-        for tc_data in generated_test_cases_raw:
-            # Create test case in database
-            test_case_create = TestCaseCreate(
+        crud.create_test_cases_bulk(session, [
+            TestCaseCreate(
                 project_id=project_id,
                 name=tc_data.get("name", "Untitled"),
                 natural_query=tc_data.get("natural_query", ""),
                 steps="[]",  # Generator doesn't produce steps yet
                 priority=tc_data.get("priority", "medium"),
-                tags=str(tc_data.get("tags", [])).replace("'", '"'),  # JSON format
+                tags=json.dumps(tc_data.get("tags", [])),
             )
-
-            saved_tc = crud.create_test_case(session, test_case_create)
-            saved_test_cases.append(GeneratedTestCaseResponse(
+            for tc_data in generated_test_cases_raw
+        ])
+        saved_test_cases = [
+            GeneratedTestCaseResponse(
                 name=tc_data.get("name", "Untitled"),
                 natural_query=tc_data.get("natural_query", ""),
                 priority=tc_data.get("priority", "medium"),
                 tags=tc_data.get("tags", []),
-            ))
+            )
+            for tc_data in generated_test_cases_raw
+        ]
 
-    # 7. Return ChatResponse
-    return ChatResponse(
+    # 7. Return ChatResponse (built from trusted graph output, so not re-validated)
+    return ChatResponse.model_construct(
         thread_id=thread_id,
         intent=intent,
         message=last_message,
@@ -1,6 +1,6 @@
 """Application configuration and feature flag API routes."""
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
 from pydantic import BaseModel
 
 from core.config import INTELLIGENT_RETRY_ENABLED
@@ -13,6 +13,12 @@ class FeaturesResponse(BaseModel):
     intelligent_retry: bool
 
 
+# Flags are read from the environment once, so the body never changes
+_FEATURES_BODY = FeaturesResponse(
+    intelligent_retry=INTELLIGENT_RETRY_ENABLED,
+).model_dump_json().encode()
+
+
 @router.get("/features", response_model=FeaturesResponse)
 def get_features():
     """Return enabled features for UI configuration.
@@ -20,6 +26,4 @@ def get_features():
     This endpoint allows the frontend to conditionally show/hide
     features based on deployment configuration.
     """
-    return FeaturesResponse(
-        intelligent_retry=INTELLIGENT_RETRY_ENABLED,
-    )
+    return Response(content=_FEATURES_BODY, media_type="application/json")
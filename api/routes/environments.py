@@ -7,6 +7,7 @@ from sqlmodel import Session
 from db.session import get_session_dep
 from db.models import EnvironmentCreate, EnvironmentRead, EnvironmentUpdate
 from db import crud
+from api.utils.dependencies import verify_project_id
 
 router = APIRouter(
     prefix="/projects/{project_id}/environments",
@@ -14,31 +15,22 @@ router = APIRouter(
 )
 
 
-def _verify_project(session: Session, project_id: int):
-    project = crud.get_project(session, project_id)
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
-    return project
-
-
 @router.get("", response_model=List[EnvironmentRead])
 def list_environments(
-    project_id: int,
+    project_id: int = Depends(verify_project_id),
     session: Session = Depends(get_session_dep),
 ):
     """List all environments for a project."""
-    _verify_project(session, project_id)
     return crud.get_environments_by_project(session, project_id)
 
 
 @router.post("", response_model=EnvironmentRead)
 def create_environment(
-    project_id: int,
     data: EnvironmentCreate,
+    project_id: int = Depends(verify_project_id),
     session: Session = Depends(get_session_dep),
 ):
     """Create a new environment."""
-    _verify_project(session, project_id)
     if data.project_id != project_id:
         raise HTTPException(status_code=400, detail="Project ID mismatch")
     return crud.create_environment(session, data)
@@ -46,13 +38,12 @@ def create_environment(
 
 @router.put("/{env_id}", response_model=EnvironmentRead)
 def update_environment(
-    project_id: int,
     env_id: int,
     data: EnvironmentUpdate,
+    project_id: int = Depends(verify_project_id),
     session: Session = Depends(get_session_dep),
 ):
     """Update an environment."""
-    _verify_project(session, project_id)
     env = crud.update_environment(session, env_id, data)
     if not env:
         raise HTTPException(status_code=404, detail="Environment not found")
@@ -65,9 +56,8 @@ def delete_environment(
     env_id: int,
     session: Session = Depends(get_session_dep),
 ):
-    """Delete an environment."""
-    _verify_project(session, project_id)
-    deleted = crud.delete_environment(session, env_id)
+    """Delete an environment of the project (404 if it belongs elsewhere)."""
+    deleted = crud.delete_environment(session, env_id, project_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Environment not found")
     return {"ok": True}
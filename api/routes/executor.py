@@ -12,7 +12,35 @@ from pydantic import BaseModel
 
 router = APIRouter(prefix="/executor", tags=["executor"])
 
-EXECUTOR_URL = os.getenv("PLAYWRIGHT_EXECUTOR_URL", "http://localhost:8932")
+# Parsed once at import so a malformed setting fails at startup, not per request
+EXECUTOR_URL = httpx.URL(os.getenv("PLAYWRIGHT_EXECUTOR_URL", "http://localhost:8932"))
+if not EXECUTOR_URL.is_absolute_url:
+    raise ValueError(f"PLAYWRIGHT_EXECUTOR_URL must be an absolute URL, got {str(EXECUTOR_URL)!r}")
+
+# Shared client so relay calls and heal DOM scans reuse keep-alive connections
+# to the executor. Created on first use and closed from the app lifespan on
+# shutdown.
+_client: httpx.AsyncClient | None = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """Return the shared executor client, creating it if needed."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            base_url=EXECUTOR_URL,
+            timeout=5.0,
+            limits=httpx.Limits(max_keepalive_connections=10),
+        )
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared executor client, if one was created."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
 
 
 class ExecutorConfigUpdate(BaseModel):
@@ -22,15 +50,14 @@ class ExecutorConfigUpdate(BaseModel):
 @router.get("/config")
 async def get_executor_config():
     """Fetch executor configuration (preload flag + browser running status)."""
-    async with httpx.AsyncClient() as client:
-        try:
-            resp = await client.get(f"{EXECUTOR_URL}/config", timeout=5.0)
-            resp.raise_for_status()
-            return resp.json()
-        except httpx.RequestError as exc:
-            raise HTTPException(status_code=503, detail=f"Executor unreachable: {exc}")
-        except httpx.HTTPStatusError as exc:
-            raise HTTPException(status_code=exc.response.status_code, detail=exc.response.text)
+    try:
+        resp = await get_client().get("/config")
+        resp.raise_for_status()
+        return resp.json()
+    except httpx.RequestError as exc:
+        raise HTTPException(status_code=503, detail=f"Executor unreachable: {exc}")
+    except httpx.HTTPStatusError as exc:
+        raise HTTPException(status_code=exc.response.status_code, detail=exc.response.text)
 
 
 @router.post("/config")
@@ -40,16 +67,15 @@ async def update_executor_config(update: ExecutorConfigUpdate):
     Setting preload=true starts any idle configured browsers immediately.
     Setting preload=false only flips the flag; running browsers stay open.
     """
-    async with httpx.AsyncClient() as client:
-        try:
-            resp = await client.post(
-                f"{EXECUTOR_URL}/config",
-                json=update.model_dump(),
-                timeout=30.0,  # starting browsers can take a few seconds each
-            )
-            resp.raise_for_status()
-            return resp.json()
-        except httpx.RequestError as exc:
-            raise HTTPException(status_code=503, detail=f"Executor unreachable: {exc}")
-        except httpx.HTTPStatusError as exc:
-            raise HTTPException(status_code=exc.response.status_code, detail=exc.response.text)
+    try:
+        resp = await get_client().post(
+            "/config",
+            json=update.model_dump(),
+            timeout=30.0,  # starting browsers can take a few seconds each
+        )
+        resp.raise_for_status()
+        return resp.json()
+    except httpx.RequestError as exc:
+        raise HTTPException(status_code=503, detail=f"Executor unreachable: {exc}")
+    except httpx.HTTPStatusError as exc:
+        raise HTTPException(status_code=exc.response.status_code, detail=exc.response.text)
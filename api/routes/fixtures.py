@@ -1,15 +1,20 @@
 """Fixture management API routes."""
 
+import asyncio
 import json
-from datetime import datetime, timedelta
+from datetime import UTC, datetime, timedelta
 from typing import List, Optional
 
+import orjson
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from sqlalchemy import delete
+from sqlalchemy.orm import joinedload
+from langchain_core.messages import HumanMessage
 from sqlmodel import Session
 
-from db.session import get_session_dep
+from db.session import get_session, get_session_dep
 from db.models import (
     Fixture,
     FixtureCreate,
@@ -21,6 +26,9 @@ from db.models import (
     FixtureScope,
 )
 from db import crud
+from agent.executor_client import PlaywrightExecutorClient
+from agent.utils.resolver import has_password_steps, mask_passwords_in_steps, resolve_references_async
+from api.utils.streaming import coalesce_frames
 from core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -52,6 +60,10 @@ class FixtureUpdateRequest(BaseModel):
     cache_ttl_seconds: Optional[int] = None
 
 
+# Fixture columns that cannot be cleared; an explicit null leaves them as is
+_NON_NULLABLE_UPDATE_FIELDS = ("name", "setup_steps", "scope", "cache_ttl_seconds")
+
+
 class FixtureGenerateRequest(BaseModel):
     """Request body for generating fixture steps from NLP."""
     prompt: str  # Natural language description of setup
@@ -64,9 +76,38 @@ class FixtureReadWithState(FixtureRead):
     cache_expires_at: Optional[datetime] = None
 
 
+def _construct(read_model, row):
+    """Build a read model from an ORM row without validation.
+
+    Routes return these with ``response_model=None``: the rows are trusted,
+    so FastAPI's validation of the response would be pure overhead.
+    """
+    return read_model.model_construct(**{name: getattr(row, name) for name in read_model.model_fields})
+
+
+def _read_with_state(fixture: Fixture, valid_state: Optional[FixtureState]) -> FixtureReadWithState:
+    """Build the read model of a fixture and its cache status.
+
+    The values come straight from the ORM row, so validation is skipped.
+    """
+    return FixtureReadWithState.model_construct(
+        id=fixture.id,
+        project_id=fixture.project_id,
+        name=fixture.name,
+        description=fixture.description,
+        setup_steps=fixture.setup_steps,
+        scope=fixture.scope,
+        cache_ttl_seconds=fixture.cache_ttl_seconds,
+        created_at=fixture.created_at,
+        updated_at=fixture.updated_at,
+        has_valid_cache=valid_state is not None,
+        cache_expires_at=valid_state.expires_at if valid_state else None,
+    )
+
+
 # --- Project-scoped endpoints ---
 
-@router.get("", response_model=List[FixtureReadWithState])
+@router.get("", response_model=None, responses={200: {"model": List[FixtureReadWithState]}})
 def list_fixtures(
     project_id: int,
     session: Session = Depends(get_session_dep)
@@ -77,31 +118,18 @@ def list_fixtures(
         raise HTTPException(status_code=404, detail="Project not found")
 
     fixtures = crud.get_fixtures_by_project(session, project_id)
+    valid_states = crud.get_valid_fixture_states_by_project(session, project_id)
     result = []
 
     for fixture in fixtures:
         # Check for valid cached state
-        valid_state = crud.get_valid_fixture_state(session, fixture.id)
-
-        fixture_data = FixtureReadWithState(
-            id=fixture.id,
-            project_id=fixture.project_id,
-            name=fixture.name,
-            description=fixture.description,
-            setup_steps=fixture.setup_steps,
-            scope=fixture.scope,
-            cache_ttl_seconds=fixture.cache_ttl_seconds,
-            created_at=fixture.created_at,
-            updated_at=fixture.updated_at,
-            has_valid_cache=valid_state is not None,
-            cache_expires_at=valid_state.expires_at if valid_state else None,
-        )
-        result.append(fixture_data)
+        valid_state = valid_states.get(fixture.id)
+        result.append(_read_with_state(fixture, valid_state))
 
     return result
 
 
-@router.post("", response_model=FixtureRead)
+@router.post("", response_model=None, responses={200: {"model": FixtureRead}})
 def create_fixture(
     project_id: int,
     request: FixtureCreateRequest,
@@ -124,7 +152,7 @@ def create_fixture(
         project_id=project_id,
         name=request.name,
         description=request.description,
-        setup_steps=json.dumps(request.setup_steps),
+        setup_steps=orjson.dumps(request.setup_steps).decode(),
         scope=request.scope,
         cache_ttl_seconds=request.cache_ttl_seconds,
     )
@@ -132,7 +160,7 @@ def create_fixture(
     db_fixture = crud.create_fixture(session, fixture)
     logger.info(f"Created fixture: id={db_fixture.id}, name={db_fixture.name}, scope={db_fixture.scope}")
 
-    return db_fixture
+    return _construct(FixtureRead, db_fixture)
 
 
 @router.post("/generate")
@@ -146,13 +174,13 @@ async def generate_fixture(
     Uses the existing LangGraph agent to convert NLP to steps.
     Returns the generated fixture data without saving it.
     """
-    project = crud.get_project(session, project_id)
+    project = await asyncio.to_thread(crud.get_project, session, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    # Import the planner directly to generate steps
+    # Import the planner directly to generate steps. Deferred: loading the
+    # planner pulls in LangGraph and the LLM stack, which startup avoids.
     from agent.nodes.planner import plan_test
-    from langchain_core.messages import HumanMessage
 
     # Build state for the planner
     # Skip fixtures context since we're generating a fixture (no dependencies)
@@ -200,7 +228,7 @@ async def generate_fixture(
 
 # --- Fixture-specific endpoints ---
 
-@fixture_router.get("/{fixture_id}", response_model=FixtureReadWithState)
+@fixture_router.get("/{fixture_id}", response_model=None, responses={200: {"model": FixtureReadWithState}})
 def get_fixture(
     fixture_id: int,
     session: Session = Depends(get_session_dep)
@@ -213,22 +241,10 @@ def get_fixture(
     # Check for valid cached state
     valid_state = crud.get_valid_fixture_state(session, fixture.id)
 
-    return FixtureReadWithState(
-        id=fixture.id,
-        project_id=fixture.project_id,
-        name=fixture.name,
-        description=fixture.description,
-        setup_steps=fixture.setup_steps,
-        scope=fixture.scope,
-        cache_ttl_seconds=fixture.cache_ttl_seconds,
-        created_at=fixture.created_at,
-        updated_at=fixture.updated_at,
-        has_valid_cache=valid_state is not None,
-        cache_expires_at=valid_state.expires_at if valid_state else None,
-    )
+    return _read_with_state(fixture, valid_state)
 
 
-@fixture_router.put("/{fixture_id}", response_model=FixtureRead)
+@fixture_router.put("/{fixture_id}", response_model=None, responses={200: {"model": FixtureRead}})
 def update_fixture(
     fixture_id: int,
     request: FixtureUpdateRequest,
@@ -243,25 +259,27 @@ def update_fixture(
     if request.scope and request.scope not in [FixtureScope.TEST.value, FixtureScope.CACHED.value]:
         raise HTTPException(status_code=400, detail=f"Invalid scope: {request.scope}. Must be 'test' or 'cached'")
 
-    # Build update data
-    update_data = FixtureUpdate(
-        name=request.name,
-        description=request.description,
-        setup_steps=json.dumps(request.setup_steps) if request.setup_steps is not None else None,
-        scope=request.scope,
-        cache_ttl_seconds=request.cache_ttl_seconds,
-    )
+    # Build update data from the fields the client sent, so omitted fields
+    # are left alone instead of being overwritten with None. Only description
+    # can be cleared; nulls for the other columns are dropped.
+    update_fields = request.model_dump(exclude_unset=True)
+    for field in _NON_NULLABLE_UPDATE_FIELDS:
+        if update_fields.get(field, ...) is None:
+            del update_fields[field]
+    if "setup_steps" in update_fields:
+        update_fields["setup_steps"] = orjson.dumps(update_fields["setup_steps"]).decode()
+    update_data = FixtureUpdate(**update_fields)
 
     updated = crud.update_fixture(session, fixture_id, update_data)
 
     # If setup_steps changed, invalidate cached state
-    if request.setup_steps is not None:
+    if "setup_steps" in update_fields:
         count = crud.delete_fixture_states_by_fixture(session, fixture_id)
         if count > 0:
             logger.info(f"Invalidated {count} cached states for fixture {fixture_id} due to steps update")
 
     logger.info(f"Updated fixture: id={fixture_id}")
-    return updated
+    return _construct(FixtureRead, updated)
 
 
 @fixture_router.delete("/{fixture_id}")
@@ -282,6 +300,55 @@ def delete_fixture(
     return {"status": "deleted"}
 
 
+# Executor events that refer to a step and carry its target/value
+_STEP_EVENTS = frozenset({"step_started", "step_completed", "step_retry"})
+
+# Appended to cached fixtures' steps; shared, so it must not be mutated
+_CAPTURE_STATE_STEP = {
+    "action": "capture_state",
+    "target": None,
+    "value": None,
+    "description": "Capture browser state for caching",
+}
+
+
+def _save_fixture_state(
+    fixture: Fixture,
+    browser: Optional[str],
+    url: Optional[str],
+    state: dict,
+) -> None:
+    """Replace the cached state of a fixture/browser combo.
+
+    Blocking; preview_fixture runs it in a worker thread so the event loop
+    keeps serving while the rows are written.
+    """
+    # Use a new session for database operations
+    with get_session() as db:
+        # Calculate expiration (stored as naive UTC, like every other timestamp)
+        expires_at = datetime.now(UTC).replace(tzinfo=None) + timedelta(seconds=fixture.cache_ttl_seconds)
+
+        # Delete old states for this fixture/browser combo in one statement
+        db.execute(
+            delete(FixtureState)
+            .where(FixtureState.fixture_id == fixture.id)
+            .where(FixtureState.browser == browser)
+        )
+
+        # Save new state
+        crud.create_fixture_state(
+            db,
+            fixture_id=fixture.id,
+            project_id=fixture.project_id,
+            url=url,
+            state_json=json.dumps(state),
+            browser=browser,
+            expires_at=expires_at,
+        )
+        db.commit()
+        logger.info(f"Saved state for fixture {fixture.id} (browser={browser}, expires={expires_at})")
+
+
 @fixture_router.post("/{fixture_id}/preview")
 async def preview_fixture(
     fixture_id: int,
@@ -292,17 +359,17 @@ async def preview_fixture(
 
     If execution succeeds and fixture scope is 'cached', automatically saves the browser state.
     """
-    fixture = crud.get_fixture(session, fixture_id)
+    # The project is loaded in the same query as the fixture
+    fixture = await asyncio.to_thread(
+        crud.get_fixture, session, fixture_id, [joinedload(Fixture.project)]
+    )
     if not fixture:
         raise HTTPException(status_code=404, detail="Fixture not found")
 
-    project = crud.get_project(session, fixture.project_id)
+    project = fixture.project
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    # Import executor client
-    from agent.executor_client import PlaywrightExecutorClient
-
     async def generate():
         """Stream fixture execution events."""
         client = PlaywrightExecutorClient()
@@ -314,24 +381,20 @@ async def preview_fixture(
             steps = fixture.get_setup_steps()
 
             # Resolve any template references in steps
-            from api.routes.test_cases import resolve_references, mask_passwords_in_steps
-            resolved_steps = resolve_references(session, project.id, steps)
-            display_steps = mask_passwords_in_steps(resolved_steps)
+            resolved_steps = await resolve_references_async(project.id, steps)
 
             # For cached fixtures, append capture_state step
             if fixture.scope == "cached":
-                resolved_steps.append({
-                    "action": "capture_state",
-                    "target": None,
-                    "value": None,
-                    "description": "Capture browser state for caching",
-                })
-                display_steps.append({
-                    "action": "capture_state",
-                    "target": None,
-                    "value": None,
-                    "description": "Capture browser state for caching",
-                })
+                resolved_steps.append(_CAPTURE_STATE_STEP)
+
+            # Display copy only when some step actually carries a password
+            if has_password_steps(resolved_steps):
+                display_steps = mask_passwords_in_steps(resolved_steps)
+            else:
+                display_steps = resolved_steps
+
+            # Masked steps by 1-based step number, as the executor reports them
+            display_by_num = dict(enumerate(display_steps, start=1))
 
             async for event in client.execute_stream(
                 base_url=project.base_url,
@@ -339,28 +402,31 @@ async def preview_fixture(
                 test_id=f"fixture-preview-{fixture_id}",
                 options={"screenshot_on_failure": True, "browser": browser},
             ):
-                # Mask passwords in output
-                if event.get("type") in ["step_started", "step_completed", "step_retry"]:
-                    step_num = event.get("step_number", 1) - 1
-                    if 0 <= step_num < len(display_steps):
-                        display_step = display_steps[step_num]
+                event_type = event.get("type")
+                if event_type in _STEP_EVENTS:
+                    # Mask passwords in output
+                    display_step = display_by_num.get(event.get("step_number", 1))
+                    if display_step:
                         event["target"] = display_step.get("target")
                         event["value"] = display_step.get("value")
 
-                # Capture state from capture_state step
-                if event.get("type") == "step_completed":
-                    if event.get("action") == "capture_state" and event.get("status") == "passed":
+                    # Capture state from capture_state step
+                    if (
+                        event_type == "step_completed"
+                        and event.get("action") == "capture_state"
+                        and event.get("status") == "passed"
+                    ):
                         result = event.get("result")
                         if result:
                             captured_state = result.get("state")
                             final_url = result.get("url")
                             logger.info(f"Captured state for fixture {fixture.id}, url={final_url}")
-                
+
                 # Track execution status
-                if event.get("type") == "completed":
+                elif event_type == "completed":
                     execution_status = event.get("status")
 
-                yield f"data: {json.dumps(event)}\n\n"
+                yield b"data: " + orjson.dumps(event) + b"\n\n"
             
             # Debug logging
             logger.info(f"Post-execution: status={execution_status}, scope={fixture.scope}, has_state={captured_state is not None}")
@@ -368,36 +434,9 @@ async def preview_fixture(
             # Save state if execution succeeded and scope is cached
             if execution_status == "passed" and fixture.scope == "cached" and captured_state:
                 try:
-                    from datetime import timedelta
-                    from db.session import get_session
-                    
-                    # Use a new session for database operations
-                    with get_session() as db:
-                        # Calculate expiration
-                        expires_at = datetime.utcnow() + timedelta(seconds=fixture.cache_ttl_seconds)
-                        
-                        # Delete old states for this fixture/browser combo
-                        from sqlmodel import select
-                        old_states = db.exec(
-                            select(FixtureState)
-                            .where(FixtureState.fixture_id == fixture.id)
-                            .where(FixtureState.browser == browser)
-                        ).all()
-                        for old_state in old_states:
-                            db.delete(old_state)
-                        
-                        # Save new state
-                        crud.create_fixture_state(
-                            db,
-                            fixture_id=fixture.id,
-                            project_id=fixture.project_id,
-                            url=final_url,
-                            state_json=json.dumps(captured_state),
-                            browser=browser,
-                            expires_at=expires_at,
-                        )
-                        db.commit()
-                        logger.info(f"Saved state for fixture {fixture.id} (browser={browser}, expires={expires_at})")
+                    await asyncio.to_thread(
+                        _save_fixture_state, fixture, browser, final_url, captured_state
+                    )
                 except Exception as e:
                     logger.error(f"Failed to save fixture state: {e}", exc_info=True)
                     # Don't fail the whole preview, just log the error
@@ -405,8 +444,9 @@ async def preview_fixture(
         finally:
             await client.close()
 
+    # Events that arrive together are sent in one write
     return StreamingResponse(
-        generate(),
+        coalesce_frames(generate()),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -435,7 +475,11 @@ def invalidate_fixture_state(
     return {"status": "invalidated", "count": count}
 
 
-@fixture_router.get("/{fixture_id}/state", response_model=Optional[FixtureStateRead])
+@fixture_router.get(
+    "/{fixture_id}/state",
+    response_model=None,
+    responses={200: {"model": Optional[FixtureStateRead]}},
+)
 def get_fixture_state(
     fixture_id: int,
     browser: Optional[str] = None,
@@ -450,4 +494,4 @@ def get_fixture_state(
         raise HTTPException(status_code=404, detail="Fixture not found")
 
     state = crud.get_valid_fixture_state(session, fixture_id, browser)
-    return state
+    return _construct(FixtureStateRead, state) if state else None
@@ -37,7 +37,7 @@ class FolderRunResponse(BaseModel):
 
 # --- Auto-seed default smart folders ---
 
-def _seed_default_folders(session: Session, project_id: int) -> None:
+def _seed_default_folders(session: Session, project_id: int) -> List[TestFolder]:
     """Create default smart folders for a project on first access."""
     defaults = [
         {
@@ -59,12 +59,12 @@ def _seed_default_folders(session: Session, project_id: int) -> None:
             "order_index": 1,
         },
     ]
-    for folder_data in defaults:
-        crud.create_folder(session, TestFolderCreate(
-            project_id=project_id,
-            **folder_data,
-        ))
+    folders = crud.create_folders_bulk(session, [
+        TestFolderCreate(project_id=project_id, **folder_data)
+        for folder_data in defaults
+    ])
     logger.info(f"Seeded default smart folders for project {project_id}")
+    return folders
 
 
 # --- Endpoints ---
@@ -83,8 +83,7 @@ def list_folders(
 
     # Auto-seed if no folders exist
     if not folders:
-        _seed_default_folders(session, project_id)
-        folders = crud.get_folders_by_project(session, project_id)
+        folders = _seed_default_folders(session, project_id)
 
     return folders
 
@@ -211,20 +210,21 @@ def get_folder_runnable_ids(
     if not folder:
         raise HTTPException(status_code=404, detail="Folder not found")
 
+    # Runnable: these statuses, with steps
+    runnable_statuses = [
+        TestCaseStatus.DRAFT, TestCaseStatus.ACTIVE, TestCaseStatus.READY, TestCaseStatus.APPROVED,
+    ]
+
     if folder.folder_type == "smart":
         test_cases = crud.compute_smart_folder_tests(session, folder)
+        runnable_ids = [
+            tc.id for tc in test_cases
+            if tc.status in runnable_statuses and tc.get_steps()
+        ]
     else:
-        test_cases = crud.get_test_cases_by_folder(
-            session, folder_id, include_descendants=True,
+        # Filtered in the database; only IDs are loaded
+        runnable_ids = crud.get_runnable_test_case_ids_by_folder(
+            session, folder_id, runnable_statuses,
         )
 
-    # Filter to runnable statuses with steps
-    runnable_statuses = [
-        TestCaseStatus.DRAFT, TestCaseStatus.ACTIVE, TestCaseStatus.READY, TestCaseStatus.APPROVED,
-    ]
-    runnable_ids = [
-        tc.id for tc in test_cases
-        if tc.status in runnable_statuses and tc.get_steps()
-    ]
-
     return FolderRunResponse(test_case_ids=runnable_ids, count=len(runnable_ids))
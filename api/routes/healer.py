@@ -1,22 +1,21 @@
-"""Auto-heal API route — POST /api/test-cases/{id}/heal."""
+"""Auto-heal API routes — POST /api/test-cases/{id}/heal and /heal/accept."""
 
+import asyncio
 import json
-import os
 from typing import Optional
 
-import httpx
+import orjson
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from sqlmodel import Session, select
 
 from db.session import get_session_dep
-from db.models import TestCase, TestRun, TestRunStep, Project, RunStatus, StepStatus
+from db.models import TestCase, TestCaseRead, TestRun, TestRunStep, Project, RunStatus, StepStatus
 from db import crud
-from agent.nodes.healer import suggest_heal, HealSuggestion
+from agent.nodes.healer import remember_heal, suggest_heal, HealedStep, HealSuggestion
+from api.routes.executor import get_client
 from core.logging import get_logger
 
-EXECUTOR_URL = os.getenv("PLAYWRIGHT_EXECUTOR_URL", "http://localhost:8932")
-
 logger = get_logger(__name__)
 
 router = APIRouter(prefix="/test-cases", tags=["healer"])
@@ -29,16 +28,16 @@ async def _scan_page_elements(url: str) -> Optional[list[str]]:
     healer can still run in screenshot-only mode.
     """
     try:
-        async with httpx.AsyncClient(timeout=20.0) as client:
-            resp = await client.post(
-                f"{EXECUTOR_URL}/scan-elements",
-                json={"url": url, "timeout": 12000},
-            )
-            if resp.status_code == 200:
-                data = resp.json()
-                elements = data.get("elements", [])
-                logger.info(f"DOM scan: {len(elements)} elements at {url}")
-                return elements or None
+        resp = await get_client().post(
+            "/scan-elements",
+            json={"url": url, "timeout": 12000},
+            timeout=20.0,
+        )
+        if resp.status_code == 200:
+            data = orjson.loads(resp.content)
+            elements = data.get("elements", [])
+            logger.info(f"DOM scan: {len(elements)} elements at {url}")
+            return elements or None
     except Exception as exc:
         logger.warning(f"DOM scan failed for {url}: {exc}")
     return None
@@ -50,52 +49,61 @@ def _resolve_failing_page_url(base_url: str, original_steps: list[dict], failed_
     Strategy: walk the steps that ran BEFORE the failing step and return the
     value of the last 'navigate' action, resolved against base_url.
     Falls back to base_url itself if no navigate step is found.
+
+    Steps are numbered from 1 by their position in original_steps.
     """
     last_navigate_value: Optional[str] = None
-    for step in original_steps:
-        sn = step.get("step_number", 0)
-        if isinstance(sn, int) and sn >= failed_step_number:
+    for sn, step in enumerate(original_steps, start=1):
+        if sn >= failed_step_number:
             break
         if step.get("action") == "navigate":
             last_navigate_value = step.get("value") or step.get("target")
 
+    base_root = base_url.rstrip("/") + "/"
     if not last_navigate_value:
         # Fallback: use base_url root
-        return base_url.rstrip("/") + "/"
+        return base_root
 
-    # If the value is a relative path, prepend base_url
-    if last_navigate_value.startswith("http"):
+    # If the value is a relative path, prepend base_url. Not urljoin: like the
+    # resolver, "/login" stays under a base_url that has a path prefix.
+    if last_navigate_value.startswith(("http://", "https://")):
         return last_navigate_value
-    return base_url.rstrip("/") + "/" + last_navigate_value.lstrip("/")
+    return base_root + last_navigate_value.lstrip("/")
 
 
 class HealRequest(BaseModel):
     run_id: int
+    # False skips previously accepted heals and always asks the LLM, e.g.
+    # when the user rejected a suggestion and asks again
+    use_memory: bool = True
 
 
-@router.post("/{test_case_id}/heal", response_model=HealSuggestion)
-async def heal_test_case(
+class HealAcceptRequest(BaseModel):
+    run_id: int
+    healed_steps: list[HealedStep]
+
+
+def _load_heal_inputs(
+    session: Session,
     test_case_id: int,
-    request: HealRequest,
-    session: Session = Depends(get_session_dep),
-):
-    """Analyse a failed run and return an AI-suggested step list fix.
+    run_id: int,
+) -> tuple[TestCase, list[dict], str, list[dict]]:
+    """Load and validate everything heal_test_case needs from the database.
 
-    The endpoint:
-    1. Verifies the test case exists.
-    2. Verifies the run belongs to this test case and is in a failed state.
-    3. Loads the failed TestRunStep rows (with error and screenshot).
-    4. Calls the healer LLM node.
-    5. Returns HealSuggestion for the frontend to render the diff dialog.
-    """
+    Returns:
+        (test_case, original_steps, base_url, failed_steps_data)
 
+    Raises:
+        HTTPException: If the test case or run is missing, the run belongs to
+            another test case, or it has no failed steps.
+    """
     # 1. Load test case
     test_case = crud.get_test_case(session, test_case_id)
     if not test_case:
         raise HTTPException(status_code=404, detail="Test case not found")
 
     # 2. Validate run
-    test_run = session.get(TestRun, request.run_id)
+    test_run = session.get(TestRun, run_id)
     if not test_run:
         raise HTTPException(status_code=404, detail="Test run not found")
     if test_run.test_case_id != test_case_id:
@@ -110,7 +118,7 @@ async def heal_test_case(
     stmt = (
         select(TestRunStep)
         .where(
-            TestRunStep.test_run_id == request.run_id,
+            TestRunStep.test_run_id == run_id,
             TestRunStep.status == StepStatus.FAILED,
         )
         .order_by(TestRunStep.step_number)
@@ -146,6 +154,30 @@ async def heal_test_case(
         for s in failed_steps
     ]
 
+    return test_case, original_steps, base_url, failed_steps_data
+
+
+@router.post("/{test_case_id}/heal", response_model=HealSuggestion)
+async def heal_test_case(
+    test_case_id: int,
+    request: HealRequest,
+    session: Session = Depends(get_session_dep),
+):
+    """Analyse a failed run and return an AI-suggested step list fix.
+
+    The endpoint:
+    1. Verifies the test case exists.
+    2. Verifies the run belongs to this test case and is in a failed state.
+    3. Loads the failed TestRunStep rows (with error and screenshot).
+    4. Calls the healer LLM node.
+    5. Returns HealSuggestion for the frontend to render the diff dialog.
+    """
+
+    # 1-6. Database loads run in a worker thread, off the event loop
+    test_case, original_steps, base_url, failed_steps_data = await asyncio.to_thread(
+        _load_heal_inputs, session, test_case_id, request.run_id
+    )
+
     logger.info(
         f"Starting heal for test_case={test_case_id}, run={request.run_id}, "
         f"failed_steps={len(failed_steps_data)}"
@@ -157,23 +189,61 @@ async def heal_test_case(
     #    (e.g. "Block button" → "Blog").
     first_failed_step_number = failed_steps_data[0]["step_number"]
 
-    # Build a numbered version of original_steps for _resolve_failing_page_url
-    numbered_steps = [
-        {**s, "step_number": i + 1}
-        for i, s in enumerate(original_steps)
-    ]
-
-    scan_url = _resolve_failing_page_url(base_url, numbered_steps, first_failed_step_number)
-    page_elements = await _scan_page_elements(scan_url) if scan_url else None
+    scan_url = _resolve_failing_page_url(base_url, original_steps, first_failed_step_number)
+    # Start the scan now; the healer awaits it only after the learned-heal
+    # lookup misses, so the executor round-trip overlaps with that work.
+    scan_task = asyncio.create_task(_scan_page_elements(scan_url)) if scan_url else None
 
     # 8. Call healer LLM node
-    suggestion = await suggest_heal(
-        test_case_name=test_case.name,
-        natural_query=test_case.natural_query or "",
-        base_url=base_url,
-        original_steps=original_steps,
-        failed_steps=failed_steps_data,
-        page_elements=page_elements,
-    )
+    try:
+        suggestion = await suggest_heal(
+            test_case_name=test_case.name,
+            natural_query=test_case.natural_query or "",
+            base_url=base_url,
+            original_steps=original_steps,
+            failed_steps=failed_steps_data,
+            page_elements=scan_task,
+            test_case_id=test_case_id if request.use_memory else None,
+        )
+    finally:
+        # No-op once awaited; drops the scan when memory answered the heal
+        if scan_task:
+            scan_task.cancel()
 
     return suggestion
+
+
+def _accept_heal(
+    session: Session,
+    test_case_id: int,
+    request: HealAcceptRequest,
+) -> TestCase:
+    """Save accepted healed steps and remember their target corrections."""
+    _, original_steps, _, failed_steps_data = _load_heal_inputs(
+        session, test_case_id, request.run_id
+    )
+
+    steps = [step.model_dump(exclude={"change_reason"}) for step in request.healed_steps]
+    test_case = crud.update_test_case(session, test_case_id, {"steps": json.dumps(steps)})
+
+    # The heal is confirmed now; a memory failure must not fail the save
+    try:
+        remember_heal(test_case_id, original_steps, failed_steps_data, request.healed_steps)
+    except Exception as exc:
+        logger.warning(f"Failed to remember heal for test_case={test_case_id}: {exc}")
+    return test_case
+
+
+@router.post("/{test_case_id}/heal/accept", response_model=TestCaseRead)
+async def accept_heal(
+    test_case_id: int,
+    request: HealAcceptRequest,
+    session: Session = Depends(get_session_dep),
+):
+    """Apply a heal the user accepted and learn its target corrections.
+
+    Saves healed_steps as the test case's steps. Target fixes for the run's
+    failed steps are remembered only here, so later heals of the same failure
+    reuse fixes the user confirmed rather than every suggestion made.
+    """
+    return await asyncio.to_thread(_accept_heal, session, test_case_id, request)
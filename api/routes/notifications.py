@@ -1,8 +1,8 @@
 """Notification channel management API routes."""
 
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Response
+from pydantic import BaseModel, TypeAdapter
 from sqlmodel import Session
 
 from db.session import get_session_dep
@@ -19,8 +19,11 @@ logger = get_logger(__name__)
 
 router = APIRouter(prefix="/projects/{project_id}/notifications", tags=["notifications"])
 
+# List serializer built once at import and reused on every list request
+_CHANNEL_LIST_ADAPTER = TypeAdapter(list[NotificationChannelRead])
 
-@router.get("", response_model=List[NotificationChannelRead])
+
+@router.get("", response_model=None, responses={200: {"model": List[NotificationChannelRead]}})
 def list_notification_channels(
     project_id: int,
     session: Session = Depends(get_session_dep)
@@ -30,7 +33,11 @@ def list_notification_channels(
     project = crud.get_project(session, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
-    return crud.get_notification_channels_by_project(session, project_id)
+    rows = crud.get_notification_channels_by_project(session, project_id)
+    # Validating from attributes keeps the Read model's field set and order;
+    # the cached adapter then dumps the whole list in one pydantic-core call.
+    body = _CHANNEL_LIST_ADAPTER.dump_json(_CHANNEL_LIST_ADAPTER.validate_python(rows, from_attributes=True))
+    return Response(body, media_type="application/json")
 
 
 class NotificationChannelCreateRequest(BaseModel):
@@ -75,7 +82,7 @@ def create_notification_channel(
     return crud.create_notification_channel(session, channel)
 
 
-@router.get("/{channel_id}", response_model=NotificationChannelRead)
+@router.get("/{channel_id}", response_model=None, responses={200: {"model": NotificationChannelRead}})
 def get_notification_channel(
     project_id: int,
     channel_id: int,
@@ -85,7 +92,11 @@ def get_notification_channel(
     channel = crud.get_notification_channel(session, channel_id)
     if not channel or channel.project_id != project_id:
         raise HTTPException(status_code=404, detail="Notification channel not found")
-    return channel
+    # Serialized by pydantic-core in one pass, skipping jsonable_encoder
+    return Response(
+        NotificationChannelRead.model_validate(channel).model_dump_json(),
+        media_type="application/json",
+    )
 
 
 class NotificationChannelUpdateRequest(BaseModel):
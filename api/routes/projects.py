@@ -1,7 +1,8 @@
 """Project management API routes."""
 
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from pydantic import TypeAdapter
 from sqlmodel import Session
 
 from db.session import get_session_dep
@@ -10,6 +11,9 @@ from db import crud
 
 router = APIRouter(prefix="/projects", tags=["projects"])
 
+# List serializer built once at import and reused on every list request
+_PROJECT_LIST_ADAPTER = TypeAdapter(list[ProjectRead])
+
 
 @router.get("/stats")
 def get_stats(session: Session = Depends(get_session_dep)):
@@ -17,14 +21,18 @@ def get_stats(session: Session = Depends(get_session_dep)):
     return crud.get_stats(session)
 
 
-@router.get("", response_model=List[ProjectRead])
+@router.get("", response_model=None, responses={200: {"model": List[ProjectRead]}})
 def list_projects(
     skip: int = 0,
     limit: int = 100,
     session: Session = Depends(get_session_dep)
 ):
     """List all projects."""
-    return crud.get_projects(session, skip=skip, limit=limit)
+    rows = crud.get_projects(session, skip=skip, limit=limit)
+    # Validating from attributes keeps the Read model's field set and order;
+    # the cached adapter then dumps the whole list in one pydantic-core call.
+    body = _PROJECT_LIST_ADAPTER.dump_json(_PROJECT_LIST_ADAPTER.validate_python(rows, from_attributes=True))
+    return Response(body, media_type="application/json")
 
 
 @router.post("", response_model=ProjectRead)
@@ -48,7 +56,7 @@ def get_project_dashboard_stats(
     return crud.get_project_dashboard(session, project_id)
 
 
-@router.get("/{project_id}", response_model=ProjectRead)
+@router.get("/{project_id}", response_model=None, responses={200: {"model": ProjectRead}})
 def get_project(
     project_id: int,
     session: Session = Depends(get_session_dep)
@@ -57,7 +65,8 @@ def get_project(
     project = crud.get_project(session, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
-    return project
+    # Serialized by pydantic-core in one pass, skipping jsonable_encoder
+    return Response(ProjectRead.model_validate(project).model_dump_json(), media_type="application/json")
 
 
 @router.put("/{project_id}", response_model=ProjectRead)
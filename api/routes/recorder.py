@@ -19,7 +19,7 @@ from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
 from sqlmodel import Session
 
-from agent.nodes.recorder_processor import RecorderEventProcessor, ProcessedStep
+from agent.nodes.recorder_processor import RecorderEventProcessor
 from agent.llm import get_llm
 from langchain_core.prompts import ChatPromptTemplate
 from db.session import engine
@@ -140,7 +140,7 @@ async def stop_recording(project_id: int):
     return {
         "session_id": session_id,
         "step_count": len(steps),
-        "steps": [s.model_dump() for s in steps],
+        "steps": [s.to_dict() for s in steps],
     }
 
 
@@ -568,10 +568,10 @@ async def recorder_websocket(websocket: WebSocket, project_id: int):
         _active_processors[project_id] = processor
 
     # Send any already-processed steps (in case of reconnect)
-    for step in processor.steps:
+    for step in processor.iter_steps():
         await websocket.send_json({
             "type": "step",
-            "data": step.model_dump(),
+            "data": step.to_dict(),
         })
 
     # Poll executor for new raw events every 500ms and stream processed steps
@@ -598,7 +598,7 @@ async def recorder_websocket(websocket: WebSocket, project_id: int):
                             for s in processor.steps[prev_count:]:
                                 await websocket.send_json({
                                     "type": "step",
-                                    "data": s.model_dump(),
+                                    "data": s.to_dict(),
                                 })
                         poll_cursor = len(all_events)
                 except Exception as e:
@@ -20,8 +20,8 @@ from db.models import (
     Fixture, FixtureScope,
 )
 from db import crud
-from agent.utils.resolver import resolve_references, mask_passwords_in_steps
-from agent.nodes.failure_classifier import classify_failure
+from agent.utils.resolver import resolve_references, resolve_references_async, mask_passwords_in_steps
+from agent.nodes.failure_classifier import classify_failure, classify_failure_once
 from api.utils.streaming import (
     streaming_context,
     sse_event,
@@ -353,7 +353,6 @@ def _get_fixture_steps(
                 logger.info(f"Using cached state for fixture '{fixture.name}' (ID: {fixture.id})")
                 decrypted = crud.get_decrypted_fixture_state(session, cached_state)
                 
-                import json
                 restore_step = {
                     "action": "restore_state",
                     "target": decrypted.get("url"),
@@ -993,12 +992,14 @@ async def _run_browser_batch(
     context: Optional[str],
     viewport: Optional[dict],
     project_id: int,
+    classifications: dict,
 ) -> None:
     """Execute all test cases for one browser, pushing SSE events to a shared queue.
 
     Each browser gets its own asyncio.Semaphore for concurrency control.
     Does NOT put a sentinel on the queue — the caller manages that.
     counters dict is mutated directly (safe because asyncio is single-threaded cooperative).
+    classifications is shared across browsers so identical failures are classified once.
     """
     semaphore = asyncio.Semaphore(parallel)
 
@@ -1028,7 +1029,7 @@ async def _run_browser_batch(
                     )
                     return
 
-                resolved_steps = resolve_references(worker_session, project_id, steps_data, env_vars=batch_env_vars, override_base_url=batch_env_base_url, environment_id=environment_id)
+                resolved_steps = await resolve_references_async(project_id, steps_data, env_vars=batch_env_vars, override_base_url=batch_env_base_url, environment_id=environment_id)
                 display_steps = mask_passwords_in_steps(resolved_steps)
 
                 original_run_id = None
@@ -1081,7 +1082,8 @@ async def _run_browser_batch(
                     failure_info = internal_result.get("failure_info")
 
                     if retry_mode == "intelligent" and failure_info:
-                        classification = await classify_failure(
+                        classification = await classify_failure_once(
+                            classifications,
                             action=failure_info.get("action", ""),
                             target=failure_info.get("target"),
                             value=failure_info.get("value"),
@@ -1209,6 +1211,8 @@ async def run_batch_stream(project_id: int, test_case_ids: List[int], browser: O
 
             # Shared counters — safe without locks because asyncio is single-threaded cooperative
             counters: dict = {"passed": 0, "failed": 0, "run_ids": []}
+            # Failure classifications keyed by (action, normalized error) for this batch
+            classifications: dict = {}
 
             if len(effective_browsers) == 1 and parallel <= 1:
                 # ── Sequential path (preserved for zero-regression on existing usage) ──
@@ -1278,7 +1282,8 @@ async def run_batch_stream(project_id: int, test_case_ids: List[int], browser: O
                         failure_info = internal_result.get("failure_info")
 
                         if retry_mode == "intelligent" and failure_info:
-                            classification = await classify_failure(
+                            classification = await classify_failure_once(
+                                classifications,
                                 action=failure_info.get("action", ""),
                                 target=failure_info.get("target"),
                                 value=failure_info.get("value"),
@@ -1346,6 +1351,7 @@ async def run_batch_stream(project_id: int, test_case_ids: List[int], browser: O
                         context=context,
                         viewport=viewport,
                         project_id=project_id,
+                        classifications=classifications,
                     ))
                     for b in effective_browsers
                 ]
@@ -396,7 +396,6 @@ def _get_fixture_steps_by_ids(
                 logger.info(f"Using cached state for fixture '{fixture.name}' (ID: {fixture.id})")
                 decrypted = crud.get_decrypted_fixture_state(session, cached_state)
                 
-                import json
                 restore_step = {
                     "action": "restore_state",
                     "target": decrypted.get("url"),
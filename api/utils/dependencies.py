@@ -0,0 +1,19 @@
+"""Shared FastAPI dependencies."""
+
+from fastapi import Depends, HTTPException
+from sqlmodel import Session
+
+from db import crud
+from db.session import get_session_dep
+
+
+def verify_project_id(project_id: int, session: Session = Depends(get_session_dep)) -> int:
+    """Path dependency: 404 unless the project exists, else its id.
+
+    Uses an id-only query, so handlers that only need the id skip loading
+    the project row. FastAPI caches get_session_dep per request, so the
+    handler shares this session.
+    """
+    if not crud.project_exists(session, project_id):
+        raise HTTPException(status_code=404, detail="Project not found")
+    return project_id
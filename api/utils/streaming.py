@@ -1,8 +1,9 @@
 """Streaming utilities for SSE test execution."""
 
+import asyncio
 import json
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator, Tuple
+from typing import AsyncGenerator, AsyncIterator, Tuple
 
 from sqlalchemy.exc import SQLAlchemyError
 from sqlmodel import Session
@@ -57,6 +58,62 @@ def sse_warning(message: str) -> str:
     return sse_event("warning", message=message)
 
 
+# Upper bound on the size of one coalesced chunk
+SSE_BATCH_BYTES = 16 * 1024
+
+_END = object()
+
+
+async def coalesce_frames(
+    frames: AsyncIterator[bytes],
+    max_bytes: int = SSE_BATCH_BYTES,
+) -> AsyncGenerator[bytes, None]:
+    """Merge SSE frames that are ready at the same time into one chunk.
+
+    The source is consumed in its own task. Each chunk starts with the next
+    frame, waiting for it if needed, and appends every frame already queued
+    up to max_bytes. Bursts of events go out in one write while a lone
+    event is never held back.
+
+    Args:
+        frames: Async iterator of encoded SSE frames
+        max_bytes: Stop appending once a chunk reaches this size
+
+    Yields:
+        Concatenated frames
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def pump():
+        try:
+            async for frame in frames:
+                queue.put_nowait(frame)
+        except Exception as e:
+            queue.put_nowait(e)
+        finally:
+            queue.put_nowait(_END)
+
+    pump_task = asyncio.create_task(pump())
+    try:
+        while True:
+            item = await queue.get()
+            chunk = bytearray()
+            while isinstance(item, bytes):
+                chunk += item
+                if len(chunk) >= max_bytes or queue.empty():
+                    item = None
+                    break
+                item = queue.get_nowait()
+            if chunk:
+                yield bytes(chunk)
+            if item is _END:
+                return
+            if isinstance(item, Exception):
+                raise item
+    finally:
+        pump_task.cancel()
+
+
 # =============================================================================
 # Streaming Context Manager
 # =============================================================================
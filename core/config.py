@@ -10,3 +10,13 @@ def _env_bool(name: str, default: bool = False) -> bool:
 
 # Feature flags
 INTELLIGENT_RETRY_ENABLED = _env_bool("INTELLIGENT_RETRY_ENABLED", False)
+
+# Process roles
+# Only one process may run scheduled tests. When serving with several workers
+# (WEB_CONCURRENCY > 1), disable this for all but one instance.
+RUN_SCHEDULER = _env_bool("RUN_SCHEDULER", True)
+
+# Uvicorn worker count. Multi-worker serving is not supported: active
+# recordings, the reference/planner context caches and their ORM-event
+# invalidation are all per process (see .env.example).
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
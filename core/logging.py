@@ -17,14 +17,17 @@ LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", 10 * 1024 * 1024))  # 10MB
 LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", 5))
 
 
-class RequestIdFormatter(logging.Formatter):
-    """Formatter that injects request_id into all log records."""
+class RequestIdFilter(logging.Filter):
+    """Filter that stamps each record with the current request_id.
 
-    def format(self, record):
-        # Ensure request_id is always present
-        if not hasattr(record, "request_id"):
-            record.request_id = request_id_var.get()
-        return super().format(record)
+    Attached to the handlers, so records from any logger (including ones
+    that bypass our formatter) carry request_id. Tasks spawned during a
+    request copy its context and keep the request_id.
+    """
+
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
 
 
 # Formats include request_id
@@ -43,13 +46,15 @@ def setup_logging() -> None:
     # Clear existing handlers to avoid duplicates on reload
     root.handlers.clear()
 
-    # Choose format - use custom formatter that injects request_id
+    # Choose format; RequestIdFilter supplies request_id on every record
     fmt = JSON_FORMAT if LOG_FORMAT == "json" else TEXT_FORMAT
-    formatter = RequestIdFormatter(fmt, datefmt="%Y-%m-%d %H:%M:%S")
+    formatter = logging.Formatter(fmt, datefmt="%Y-%m-%d %H:%M:%S")
+    request_id_filter = RequestIdFilter()
 
     # Console handler (always enabled)
     console = logging.StreamHandler(sys.stdout)
     console.setFormatter(formatter)
+    console.addFilter(request_id_filter)
     root.addHandler(console)
 
     # File handler (optional)
@@ -60,6 +65,7 @@ def setup_logging() -> None:
             backupCount=LOG_BACKUP_COUNT,
         )
         file_handler.setFormatter(formatter)
+        file_handler.addFilter(request_id_filter)
         root.addHandler(file_handler)
 
     # Reduce noise from third-party libraries
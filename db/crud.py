@@ -1,14 +1,15 @@
 """CRUD operations for database models."""
 
-from datetime import datetime, timedelta
+from datetime import UTC, datetime, timedelta
 from typing import List, Optional
-from sqlmodel import Session, select
+from sqlmodel import Session, or_, select
 
 from db.models import (
     Project, ProjectCreate,
     TestCase, TestCaseCreate,
     TestRun, TestRunCreate,
     TestRunStep, TestRunStepCreate,
+    HealMemory,
     Persona, PersonaCreate, PersonaUpdate,
     Page, PageCreate, PageUpdate,
     Fixture, FixtureCreate, FixtureUpdate,
@@ -57,6 +58,12 @@ def get_project(session: Session, project_id: int) -> Optional[Project]:
     return session.get(Project, project_id)
 
 
+def project_exists(session: Session, project_id: int) -> bool:
+    """Check that a project exists without loading the row."""
+    statement = select(Project.id).where(Project.id == project_id)
+    return session.exec(statement).first() is not None
+
+
 def get_projects(session: Session, skip: int = 0, limit: int = 100) -> List[Project]:
     """Get all projects with pagination."""
     statement = select(Project).offset(skip).limit(limit)
@@ -163,6 +170,29 @@ def create_test_case(session: Session, test_case: TestCaseCreate) -> TestCase:
     return db_test_case
 
 
+def create_test_cases_bulk(session: Session, test_cases: List[TestCaseCreate]) -> List[TestCase]:
+    """Create several test cases in one transaction with auto-assigned numbers.
+
+    Rows are not refreshed after the commit; attributes load on first access.
+    """
+    projects: dict = {}
+    db_test_cases = []
+    for test_case in test_cases:
+        db_test_case = TestCase.model_validate(test_case)
+        if test_case.project_id not in projects:
+            projects[test_case.project_id] = session.get(Project, test_case.project_id)
+        project = projects[test_case.project_id]
+        if project:
+            db_test_case.test_case_number = project.next_test_case_number
+            project.next_test_case_number += 1
+        db_test_cases.append(db_test_case)
+
+    session.add_all([p for p in projects.values() if p])
+    session.add_all(db_test_cases)
+    session.commit()
+    return db_test_cases
+
+
 def get_test_case(session: Session, test_case_id: int) -> Optional[TestCase]:
     """Get a test case by ID."""
     return session.get(TestCase, test_case_id)
@@ -455,6 +485,51 @@ def get_test_run_steps(session: Session, test_run_id: int) -> List[TestRunStep]:
     return session.exec(statement).all()
 
 
+# --- HealMemory CRUD ---
+
+def get_heal_memory(
+    session: Session,
+    test_case_id: int,
+    step_number: int,
+    error_hash: str,
+) -> Optional[HealMemory]:
+    """Get a learned heal for a test case step and error signature."""
+    statement = select(HealMemory).where(
+        HealMemory.test_case_id == test_case_id,
+        HealMemory.step_number == step_number,
+        HealMemory.error_hash == error_hash,
+    )
+    return session.exec(statement).first()
+
+
+def upsert_heal_memory(
+    session: Session,
+    test_case_id: int,
+    step_number: int,
+    error_hash: str,
+    original_target: Optional[str],
+    healed_target: str,
+) -> HealMemory:
+    """Create or replace a learned heal for a test case step and error signature."""
+    memory = get_heal_memory(session, test_case_id, step_number, error_hash)
+    if memory:
+        memory.original_target = original_target
+        memory.healed_target = healed_target
+        memory.updated_at = datetime.utcnow()
+    else:
+        memory = HealMemory(
+            test_case_id=test_case_id,
+            step_number=step_number,
+            error_hash=error_hash,
+            original_target=original_target,
+            healed_target=healed_target,
+        )
+    session.add(memory)
+    session.commit()
+    session.refresh(memory)
+    return memory
+
+
 # --- Persona CRUD ---
 
 def create_persona(session: Session, persona: PersonaCreate) -> Persona:
@@ -619,9 +694,19 @@ def create_fixture(session: Session, fixture: FixtureCreate) -> Fixture:
     return db_fixture
 
 
-def get_fixture(session: Session, fixture_id: int) -> Optional[Fixture]:
-    """Get a fixture by ID."""
-    return session.get(Fixture, fixture_id)
+def get_fixture(session: Session, fixture_id: int, options: Optional[list] = None) -> Optional[Fixture]:
+    """Get a fixture by ID.
+
+    Args:
+        session: Database session
+        fixture_id: Fixture ID
+        options: Optional loader options, e.g. ``[joinedload(Fixture.project)]``
+            when the caller will touch that relationship
+
+    Returns:
+        Fixture or None if not found
+    """
+    return session.get(Fixture, fixture_id, options=options)
 
 
 def get_fixtures_by_project(session: Session, project_id: int) -> List[Fixture]:
@@ -723,7 +808,7 @@ def get_valid_fixture_state(
     Returns:
         Valid FixtureState or None if no valid state exists
     """
-    now = datetime.utcnow()
+    now = datetime.now(UTC).replace(tzinfo=None)
 
     statement = (
         select(FixtureState)
@@ -738,6 +823,40 @@ def get_valid_fixture_state(
     return session.exec(statement).first()
 
 
+def get_valid_fixture_states_by_project(
+    session: Session,
+    project_id: int,
+    browser: Optional[str] = None
+) -> dict[int, FixtureState]:
+    """Get the latest valid (non-expired) state of every fixture in a project.
+
+    One query replaces a ``get_valid_fixture_state`` call per fixture.
+
+    Args:
+        session: Database session
+        project_id: Project ID
+        browser: Optional browser filter (e.g., 'chromium-headless')
+
+    Returns:
+        dict mapping fixture_id to its most recently captured valid state;
+        fixtures without a valid state are absent
+    """
+    now = datetime.now(UTC).replace(tzinfo=None)
+
+    statement = (
+        select(FixtureState)
+        .where(FixtureState.project_id == project_id)
+        .where(FixtureState.expires_at > now)
+        .order_by(FixtureState.captured_at)
+    )
+
+    if browser:
+        statement = statement.where(FixtureState.browser == browser)
+
+    # Ascending order, so the newest state per fixture is written last
+    return {state.fixture_id: state for state in session.exec(statement)}
+
+
 def get_decrypted_fixture_state(session: Session, state: FixtureState) -> dict:
     """Decrypt fixture state data.
 
@@ -779,16 +898,13 @@ def delete_fixture_states_by_fixture(session: Session, fixture_id: int) -> int:
     Returns:
         Number of states deleted
     """
-    states = session.exec(
-        select(FixtureState).where(FixtureState.fixture_id == fixture_id)
-    ).all()
-
-    count = len(states)
-    for state in states:
-        session.delete(state)
+    from sqlalchemy import delete
 
+    result = session.execute(
+        delete(FixtureState).where(FixtureState.fixture_id == fixture_id)
+    )
     session.commit()
-    return count
+    return result.rowcount
 
 
 def delete_expired_fixture_states(session: Session) -> int:
@@ -797,17 +913,14 @@ def delete_expired_fixture_states(session: Session) -> int:
     Returns:
         Number of states deleted
     """
-    now = datetime.utcnow()
-    expired_states = session.exec(
-        select(FixtureState).where(FixtureState.expires_at <= now)
-    ).all()
-
-    count = len(expired_states)
-    for state in expired_states:
-        session.delete(state)
+    from sqlalchemy import delete
 
+    now = datetime.now(UTC).replace(tzinfo=None)
+    result = session.execute(
+        delete(FixtureState).where(FixtureState.expires_at <= now)
+    )
     session.commit()
-    return count
+    return result.rowcount
 
 
 # --- TestFolder CRUD ---
@@ -830,6 +943,27 @@ def create_folder(session: Session, folder: TestFolderCreate) -> TestFolder:
     return db_folder
 
 
+def create_folders_bulk(session: Session, folders: List[TestFolderCreate]) -> List[TestFolder]:
+    """Create several top-level folders with one INSERT ... RETURNING.
+
+    Parent folders are not validated, so this is only for folders without
+    a parent_id. The returned folders are detached and fully loaded, so
+    reading them issues no further queries.
+    """
+    from sqlalchemy import insert
+
+    rows = [
+        TestFolder.model_validate(folder).model_dump(exclude={"id"})
+        for folder in folders
+    ]
+    db_folders = list(session.scalars(insert(TestFolder).returning(TestFolder), rows))
+    # Detach before committing so the commit does not expire the returned values
+    for db_folder in db_folders:
+        session.expunge(db_folder)
+    session.commit()
+    return db_folders
+
+
 def get_folder(session: Session, folder_id: int) -> Optional[TestFolder]:
     """Get a folder by ID."""
     return session.get(TestFolder, folder_id)
@@ -937,6 +1071,35 @@ def get_test_cases_by_folder(
     return session.exec(statement).all()
 
 
+def get_runnable_test_case_ids_by_folder(
+    session: Session,
+    folder_id: int,
+    statuses: List[str],
+) -> List[int]:
+    """Get IDs of test cases with steps in a folder or its sub-folders.
+
+    Status and step filtering happen in SQL and only IDs are fetched. Folders
+    nest at most two levels deep, so sub-folders are the direct children.
+
+    Args:
+        session: Database session
+        folder_id: Folder ID
+        statuses: Test case statuses to include
+
+    Returns:
+        Matching test case IDs
+    """
+    child_ids = select(TestFolder.id).where(TestFolder.parent_id == folder_id)
+    statement = (
+        select(TestCase.id)
+        .where(or_(TestCase.folder_id == folder_id, TestCase.folder_id.in_(child_ids)))
+        .where(TestCase.status.in_(statuses))
+        .where(TestCase.steps.is_not(None))
+        .where(TestCase.steps.not_in(["", "[]", "null"]))
+    )
+    return list(session.exec(statement).all())
+
+
 def compute_smart_folder_tests(session: Session, folder: TestFolder) -> List[TestCase]:
     """Evaluate smart_criteria against all project test cases."""
     criteria = folder.get_smart_criteria()
@@ -1666,10 +1829,17 @@ def update_environment(session: Session, env_id: int, data: EnvironmentUpdate) -
     return env
 
 
-def delete_environment(session: Session, env_id: int) -> bool:
-    env = session.get(Environment, env_id)
-    if not env:
-        return False
-    session.delete(env)
+def delete_environment(session: Session, env_id: int, project_id: Optional[int] = None) -> bool:
+    """Delete an environment in one statement, optionally scoped to a project.
+
+    Returns:
+        True if a row was deleted
+    """
+    from sqlalchemy import delete
+
+    stmt = delete(Environment).where(Environment.id == env_id)
+    if project_id is not None:
+        stmt = stmt.where(Environment.project_id == project_id)
+    result = session.execute(stmt)
     session.commit()
-    return True
+    return result.rowcount == 1
@@ -0,0 +1,18 @@
+-- Migration 009: Add heal memory
+-- Date: 2026-10-16
+-- Description: Stores healer target corrections so repeated failures on the
+--              same step and error can be healed without an LLM call
+
+CREATE TABLE IF NOT EXISTS healmemory (
+    id INTEGER PRIMARY KEY,
+    test_case_id INTEGER NOT NULL REFERENCES testcase(id) ON DELETE CASCADE,
+    step_number INTEGER NOT NULL,
+    error_hash VARCHAR NOT NULL,
+    original_target VARCHAR,
+    healed_target VARCHAR NOT NULL,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS ix_healmemory_test_case_id ON healmemory(test_case_id);
+CREATE INDEX IF NOT EXISTS ix_healmemory_error_hash ON healmemory(error_hash);
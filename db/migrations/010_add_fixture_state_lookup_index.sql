@@ -0,0 +1,7 @@
+-- Migration 010: Add fixture state lookup index
+-- Date: 2026-10-16
+-- Description: Composite index for the valid cached state lookup, which filters
+--              on fixture_id, optionally browser, and expires_at > now.
+--              Works on both SQLite and PostgreSQL.
+
+CREATE INDEX IF NOT EXISTS ix_fixturestate_lookup ON fixturestate(fixture_id, browser, expires_at);
@@ -4,9 +4,10 @@ from datetime import datetime
 from enum import Enum
 from typing import Optional, List
 from sqlmodel import SQLModel, Field, Relationship
-from sqlalchemy import Column, Integer, ForeignKey
+from sqlalchemy import Column, Integer, ForeignKey, Index
 from pydantic import field_serializer
 import json
+import orjson
 
 
 def serialize_datetime_utc(dt: Optional[datetime]) -> Optional[str]:
@@ -336,6 +337,19 @@ class TestRunStepRead(TestRunStepBase):
     created_at: datetime
 
 
+# --- HealMemory (learned healer target corrections) ---
+
+class HealMemory(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    test_case_id: int = Field(sa_column=Column(Integer, ForeignKey("testcase.id", ondelete="CASCADE"), index=True, nullable=False))
+    step_number: int
+    error_hash: str = Field(index=True)  # sha1 of the normalized error message
+    original_target: Optional[str] = None
+    healed_target: str
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
 # --- Persona ---
 
 class PersonaBase(SQLModel):
@@ -446,12 +460,16 @@ class Fixture(FixtureBase, table=True):
     states: List["FixtureState"] = Relationship(back_populates="fixture", sa_relationship_kwargs={"cascade": "all, delete-orphan"})
 
     def get_setup_steps(self) -> list:
-        """Parse setup_steps JSON."""
-        return json.loads(self.setup_steps) if self.setup_steps else []
+        """Parse setup_steps JSON.
+
+        Read for every fixture a run or plan uses, so the faster orjson
+        parser is used.
+        """
+        return orjson.loads(self.setup_steps) if self.setup_steps else []
 
     def set_setup_steps(self, steps: list):
         """Set setup_steps as JSON."""
-        self.setup_steps = json.dumps(steps)
+        self.setup_steps = orjson.dumps(steps).decode()
 
 
 class FixtureCreate(FixtureBase):
@@ -486,6 +504,11 @@ class FixtureStateBase(SQLModel):
 
 
 class FixtureState(FixtureStateBase, table=True):
+    # Serves the valid-state lookup: fixture_id, optional browser, expires_at > now
+    __table_args__ = (
+        Index("ix_fixturestate_lookup", "fixture_id", "browser", "expires_at"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     fixture_id: int = Field(foreign_key="fixture.id", index=True)
     project_id: int = Field(foreign_key="project.id", index=True)
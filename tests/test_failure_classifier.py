@@ -0,0 +1,104 @@
+"""Tests for the failure classifier node."""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from agent.nodes import failure_classifier
+from agent.nodes.failure_classifier import FailureClassification, classify_failure, classify_failure_once
+
+
+RESULT = FailureClassification(
+    is_retryable=True,
+    failure_category="timeout",
+    confidence=0.8,
+    reasoning="Element wait timed out",
+)
+
+NOT_RETRYABLE = FailureClassification(
+    is_retryable=False,
+    failure_category="application_error",
+    confidence=0.9,
+    reasoning="Page shows a server error",
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    failure_classifier._classification_cache.clear()
+    yield
+    failure_classifier._classification_cache.clear()
+
+
+def _mock_llm(side_effect):
+    runnable = MagicMock()
+    runnable.ainvoke = AsyncMock(side_effect=side_effect)
+    return patch("agent.nodes.failure_classifier.get_structured_llm", return_value=runnable), runnable
+
+
+class TestClassificationCache:
+    """Tests for reuse of classifications across retries."""
+
+    @pytest.mark.asyncio
+    async def test_same_screenshot_and_error_skip_llm(self):
+        patcher, runnable = _mock_llm([RESULT])
+        with patcher:
+            first = await classify_failure("click", "Save", None, "Timeout 5000ms exceeded", "aGVsbG8=")
+            second = await classify_failure("click", "Save", None, "Timeout 3000ms exceeded", "aGVsbG8=")
+
+        assert first == second == RESULT
+        assert runnable.ainvoke.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_different_screenshot_is_classified_again(self):
+        patcher, runnable = _mock_llm([RESULT, RESULT])
+        with patcher:
+            await classify_failure("click", "Save", None, "Timeout", "aGVsbG8=")
+            await classify_failure("click", "Save", None, "Timeout", "d29ybGQ=")
+
+        assert runnable.ainvoke.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_different_target_is_classified_again(self):
+        patcher, runnable = _mock_llm([RESULT, RESULT])
+        with patcher:
+            await classify_failure("click", "Save", None, "Element not found")
+            await classify_failure("click", "Cancel", None, "Element not found")
+
+        assert runnable.ainvoke.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_classification_is_not_cached(self):
+        patcher, runnable = _mock_llm([RuntimeError("boom"), RESULT])
+        with patcher:
+            fallback = await classify_failure("click", "Save", None, "Timeout")
+            result = await classify_failure("click", "Save", None, "Timeout")
+
+        assert fallback.failure_category == "unknown"
+        assert result == RESULT
+
+
+class TestClassifyFailureOnce:
+    """Tests for per-batch grouping of failure classifications."""
+
+    @pytest.mark.asyncio
+    async def test_same_step_shares_one_classification(self):
+        groups: dict = {}
+        patcher, runnable = _mock_llm([RESULT])
+        with patcher:
+            first = await classify_failure_once(groups, "click", "Save", None, "Element not found after 5000ms")
+            second = await classify_failure_once(groups, "click", "Save", None, "Element not found after 3000ms")
+
+        assert first == second == RESULT
+        assert runnable.ainvoke.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_different_targets_do_not_share_classification(self):
+        groups: dict = {}
+        patcher, runnable = _mock_llm([RESULT, NOT_RETRYABLE])
+        with patcher:
+            save = await classify_failure_once(groups, "click", "Save", None, "Element not found after 5000ms")
+            cancel = await classify_failure_once(groups, "click", "Cancel", None, "Element not found after 5000ms")
+
+        assert save == RESULT
+        assert cancel == NOT_RETRYABLE
+        assert len(groups) == 2
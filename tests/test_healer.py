@@ -0,0 +1,225 @@
+"""Tests for the auto-heal node."""
+
+import asyncio
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, create_engine
+
+from agent.nodes import healer
+from agent.nodes.heal_memory import error_signature, record_heal
+from agent.utils.errors import normalize_error
+
+
+@pytest.fixture
+def memory_engine():
+    """Point heal memory at an in-memory SQLite database."""
+    # Lookups run in a worker thread, so share one connection across threads
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    with patch("agent.nodes.heal_memory.engine", engine):
+        yield engine
+
+
+ORIGINAL_STEPS = [
+    {"action": "navigate", "target": None, "value": "/", "description": "Open home"},
+    {"action": "click", "target": "Block button", "value": None, "description": "Open blog"},
+]
+
+FAILED_STEPS = [
+    {"step_number": 2, "action": "click", "target": "Block button", "error": "Element not found after 5000ms"},
+]
+
+
+class TestNormalizeError:
+    """Tests for error normalization."""
+
+    def test_numbers_and_whitespace_are_normalized(self):
+        assert normalize_error("Timeout  5000ms\nexceeded") == normalize_error("timeout 30000ms exceeded")
+
+    def test_empty_error(self):
+        assert normalize_error(None) == ""
+        assert error_signature(None) == error_signature("")
+
+
+class TestSuggestHealMemory:
+    """Tests for suggest_heal reuse of learned heals."""
+
+    @pytest.mark.asyncio
+    async def test_learned_heal_is_reused_without_llm(self, memory_engine):
+        record_heal(7, 2, "Element not found after 3000ms", "Block button", "Blog")
+
+        with patch("agent.nodes.healer.get_structured_llm") as mock_llm:
+            suggestion = await healer.suggest_heal(
+                test_case_name="Blog",
+                natural_query="open the blog",
+                base_url="http://localhost",
+                original_steps=ORIGINAL_STEPS,
+                failed_steps=FAILED_STEPS,
+                test_case_id=7,
+            )
+
+        mock_llm.assert_not_called()
+        assert suggestion.changed_step_numbers == [2]
+        assert suggestion.healed_steps[1].target == "Blog"
+        assert suggestion.healed_steps[1].change_reason == "cached-heal"
+        assert suggestion.healed_steps[0].target is None
+
+    @pytest.mark.asyncio
+    async def test_pending_scan_is_not_awaited_on_memory_hit(self, memory_engine):
+        record_heal(7, 2, "Element not found after 3000ms", "Block button", "Blog")
+        scan_started = asyncio.Event()
+
+        async def scan_page():
+            scan_started.set()
+            await asyncio.Event().wait()
+
+        scan = asyncio.create_task(scan_page())
+        try:
+            suggestion = await healer.suggest_heal(
+                test_case_name="Blog",
+                natural_query="open the blog",
+                base_url="http://localhost",
+                original_steps=ORIGINAL_STEPS,
+                failed_steps=FAILED_STEPS,
+                page_elements=scan,
+                test_case_id=7,
+            )
+
+            assert suggestion.changed_step_numbers == [2]
+            # The scan ran while the lookup was in flight but was never awaited
+            assert scan_started.is_set()
+            assert not scan.done()
+        finally:
+            scan.cancel()
+
+    def test_accepted_heal_is_remembered(self, memory_engine):
+        healed = [
+            healer.HealedStep(action="navigate", value="/", description="Open home"),
+            healer.HealedStep(action="click", target="Blog", description="Open blog"),
+        ]
+
+        healer.remember_heal(7, ORIGINAL_STEPS, FAILED_STEPS, healed)
+
+        suggestion = healer._suggest_from_memory(7, ORIGINAL_STEPS, FAILED_STEPS)
+        assert suggestion.healed_steps[1].target == "Blog"
+
+    def test_memory_reused_when_target_unchanged(self, memory_engine):
+        record_heal(7, 2, FAILED_STEPS[0]["error"], "Block button", "Blog")
+
+        suggestion = healer._suggest_from_memory(7, ORIGINAL_STEPS, FAILED_STEPS)
+        assert suggestion.changed_step_numbers == [2]
+
+    def test_memory_ignored_when_target_changed(self, memory_engine):
+        # Same step and error, so only the original_target guard can reject it
+        record_heal(7, 2, FAILED_STEPS[0]["error"], "Old button", "Blog")
+
+        assert healer._suggest_from_memory(7, ORIGINAL_STEPS, FAILED_STEPS) is None
+
+
+class TestStreamHeal:
+    """Tests for streaming heal output."""
+
+    @staticmethod
+    def _fake_model(partials):
+        async def astream(_messages):
+            for partial in partials:
+                yield partial
+
+        model = MagicMock()
+        model.astream = astream
+        return model
+
+    @pytest.mark.asyncio
+    async def test_steps_are_yielded_before_final_suggestion(self):
+        first = {"action": "navigate", "value": "/", "description": "Open home"}
+        second = {"action": "click", "target": "Blog", "description": "Open blog"}
+        partials = [
+            {"healed_steps": [{"action": "navigate"}]},
+            {"healed_steps": [first, {"action": "cl"}]},
+            {"healed_steps": [first, second], "changed_step_numbers": [2],
+             "explanation": "Renamed target", "confidence": 0.9},
+        ]
+
+        with patch("agent.nodes.healer.get_structured_llm", return_value=self._fake_model(partials)):
+            items = [
+                item async for item in healer.stream_heal(
+                    test_case_name="Blog",
+                    natural_query="open the blog",
+                    base_url="http://localhost",
+                    original_steps=ORIGINAL_STEPS,
+                    failed_steps=FAILED_STEPS,
+                )
+            ]
+
+        assert [type(i) for i in items] == [healer.HealedStep, healer.HealedStep, healer.HealSuggestion]
+        assert items[0].action == "navigate"
+        assert items[1].target == "Blog"
+        assert items[2].changed_step_numbers == [2]
+
+    @pytest.mark.asyncio
+    async def test_suggest_heal_falls_back_on_llm_error(self):
+        async def astream(_messages):
+            raise RuntimeError("boom")
+            yield  # pragma: no cover
+
+        model = MagicMock()
+        model.astream = astream
+
+        with patch("agent.nodes.healer.get_structured_llm", return_value=model):
+            suggestion = await healer.suggest_heal(
+                test_case_name="Blog",
+                natural_query="open the blog",
+                base_url="http://localhost",
+                original_steps=ORIGINAL_STEPS,
+                failed_steps=FAILED_STEPS,
+            )
+
+        assert suggestion.confidence == 0.0
+        assert suggestion.changed_step_numbers == []
+        assert len(suggestion.healed_steps) == 2
+
+    @pytest.mark.asyncio
+    async def test_llm_suggestion_is_not_remembered(self, memory_engine):
+        step = {"action": "click", "target": "Blog", "description": "Open blog"}
+        partials = [
+            {"healed_steps": [ORIGINAL_STEPS[0], step], "changed_step_numbers": [2],
+             "explanation": "Renamed target", "confidence": 0.9},
+        ]
+
+        with patch("agent.nodes.healer.get_structured_llm", return_value=self._fake_model(partials)):
+            suggestion = await healer.suggest_heal(
+                test_case_name="Blog",
+                natural_query="open the blog",
+                base_url="http://localhost",
+                original_steps=ORIGINAL_STEPS,
+                failed_steps=FAILED_STEPS,
+                test_case_id=7,
+            )
+
+        assert suggestion.changed_step_numbers == [2]
+        # Only an accepted heal is learned; a suggestion may still be rejected
+        assert healer._suggest_from_memory(7, ORIGINAL_STEPS, FAILED_STEPS) is None
+
+class TestBuildMessages:
+    """Tests for heal prompt formatting."""
+
+    def test_grouped_failures_keep_each_target(self):
+        failed = [
+            {"step_number": 2, "action": "click", "target": "Block button", "error": "Element not found after 5000ms"},
+            {"step_number": 3, "action": "click", "target": "Contakt", "error": "Element not found after 3000ms"},
+        ]
+
+        messages = healer._build_messages("Blog", "open the blog", "http://localhost", ORIGINAL_STEPS, failed, None)
+        text = messages[1].content
+
+        assert "2 steps failed with the same error" in text
+        assert "Step 2 [click] target=Block button" in text
+        assert "Step 3 [click] target=Contakt" in text
+        assert text.count("Error: ") == 1
@@ -0,0 +1,52 @@
+"""Tests for the test planning node."""
+
+import pytest
+from unittest.mock import patch
+
+from sqlmodel import Session, SQLModel, create_engine
+
+from agent.nodes import planner
+from db.models import Page, Project
+
+
+@pytest.fixture
+def planner_engine():
+    """Point the planner at an in-memory SQLite database with one project."""
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(Project(name="Shop", base_url="http://localhost", base_prompt="An online shop"))
+        session.commit()
+    planner._project_context_cache.clear()
+    with patch("agent.nodes.planner.engine", engine):
+        yield engine
+    planner._project_context_cache.clear()
+
+
+class TestBuildProjectContexts:
+    """Tests for cached project context loading."""
+
+    def test_no_project(self):
+        assert planner.build_project_contexts(None) == ("", "No project context available.", "", frozenset())
+
+    def test_context_is_cached(self, planner_engine):
+        first = planner.build_project_contexts("1")
+
+        with patch("agent.nodes.planner._load_project_contexts") as mock_load:
+            second = planner.build_project_contexts("1")
+
+        mock_load.assert_not_called()
+        assert second == first
+        assert "An online shop" in first[0]
+
+    def test_page_change_invalidates_cache(self, planner_engine):
+        _, personas_and_pages, _, valid_templates = planner.build_project_contexts("1")
+        assert "login" not in valid_templates
+
+        with Session(planner_engine) as session:
+            session.add(Page(name="login", path="/login", project_id=1))
+            session.commit()
+
+        _, personas_and_pages, _, valid_templates = planner.build_project_contexts("1")
+        assert "login" in valid_templates
+        assert "'/login'" in personas_and_pages
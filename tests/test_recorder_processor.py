@@ -0,0 +1,52 @@
+"""Tests for the recorder event processor."""
+
+from agent.nodes.recorder_processor import RecorderEventProcessor
+
+
+def _process(events: list[dict]) -> list:
+    processor = RecorderEventProcessor(base_url="http://localhost:3000")
+    for event in events:
+        processor.process_event(event)
+    return list(processor.get_all_steps())
+
+
+class TestTypeDebounce:
+    """Tests for collapsing consecutive type events."""
+
+    def test_consecutive_type_events_on_same_field_merge(self):
+        steps = _process([
+            {"type": "type", "text": "Email", "value": "a"},
+            {"type": "type", "text": "Email", "value": "ab"},
+            {"type": "type", "text": "Email", "value": "abc"},
+        ])
+
+        assert [(s.action, s.target, s.value) for s in steps] == [("type", "Email", "abc")]
+
+    def test_field_change_and_other_events_flush_typing(self):
+        steps = _process([
+            {"type": "type", "text": "Email", "value": "a@b.c"},
+            {"type": "type", "text": "Password", "value": "secret", "is_password": True},
+            {"type": "click", "tag": "BUTTON", "text": "Sign in"},
+            {"type": "type", "text": "Search", "value": "q"},
+        ])
+
+        assert [(s.action, s.target, s.value) for s in steps] == [
+            ("type", "Email", "a@b.c"),
+            ("type", "Password", "{{password}}"),
+            ("click", "Sign in", None),
+            ("type", "Search", "q"),
+        ]
+
+
+class TestLinkClickNavigation:
+    """Tests for merging a link click with the navigation it triggers."""
+
+    def test_navigate_after_link_click_is_dropped(self):
+        steps = _process([
+            {"type": "click", "tag": "A", "text": "Blog", "timestamp": 1000},
+            {"type": "navigate", "value": "http://localhost:3000/blog", "timestamp": 1200},
+        ])
+
+        assert len(steps) == 1
+        assert steps[0].action == "click"
+        assert steps[0].causes_navigation is True
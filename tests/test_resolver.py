@@ -0,0 +1,135 @@
+"""Tests for step reference resolution."""
+
+import pytest
+from unittest.mock import patch
+
+from cryptography.fernet import Fernet
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+
+from agent.utils import resolver
+from db import encryption
+from db import models
+from db.models import Page, Persona, Project
+
+
+@pytest.fixture
+def session():
+    """In-memory database with one project, persona, page and dataset."""
+    # One shared connection, so worker-thread sessions see the same database
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    fernet = Fernet(Fernet.generate_key())
+    resolver._refs_cache.clear()
+    with patch.object(encryption, "_fernet", fernet), patch.object(resolver, "engine", engine), \
+            Session(engine) as session:
+        session.add(Project(name="Shop", base_url="http://shop.test/"))
+        session.commit()
+        session.add(Persona(
+            name="admin", username="admin@shop.test", project_id=1,
+            encrypted_password=fernet.encrypt(b"s3cret").decode(),
+        ))
+        session.add(Page(name="login", path="/login", project_id=1))
+        session.add(models.TestData(name="users", data='{"email": "a@b.c"}', project_id=1))
+        session.commit()
+        yield session
+    resolver._refs_cache.clear()
+
+
+class TestResolveReferences:
+    """Tests for resolve_references."""
+
+    def test_resolves_all_reference_kinds(self, session):
+        steps = [
+            {"action": "navigate", "target": None, "value": "{{login}}"},
+            {"action": "fill_form", "target": None,
+             "value": '{"email": "{{admin.username}}", "password": "{{admin.password}}"}'},
+            {"action": "type", "target": "Search", "value": "{{data.users.email}} {{env.REGION}}"},
+            {"action": "click", "target": "{{unknown.ref}}", "value": None},
+        ]
+
+        resolved = resolver.resolve_references(session, 1, steps, env_vars={"REGION": "eu"})
+
+        assert resolved[0]["value"] == "http://shop.test/login"
+        assert resolved[1]["value"] == '{"email": "admin@shop.test", "password": "s3cret"}'
+        assert resolved[2]["value"] == "a@b.c eu"
+        assert resolved[3]["target"] == "{{unknown.ref}}"
+        assert resolved[3] is not steps[3]
+
+    def test_static_steps_are_reused(self, session):
+        steps = [
+            {"action": "click", "target": "Save", "value": None},
+            {"action": "navigate", "target": None, "value": "/login"},
+        ]
+
+        resolved = resolver.resolve_references(session, 1, steps)
+
+        assert resolved[0] is steps[0]
+        assert resolved[1] == {"action": "navigate", "target": None, "value": "http://shop.test/login"}
+        assert steps[1]["value"] == "/login"
+
+    def test_page_change_invalidates_cached_refs(self, session):
+        steps = [{"action": "navigate", "target": None, "value": "{{login}}"}]
+        assert resolver.resolve_references(session, 1, steps)[0]["value"] == "http://shop.test/login"
+
+        page = session.get(Page, 1)
+        page.path = "/signin"
+        session.add(page)
+        session.commit()
+
+        assert resolver.resolve_references(session, 1, steps)[0]["value"] == "http://shop.test/signin"
+
+    def test_static_steps_skip_lookups(self, session):
+        steps = [{"action": "navigate", "target": None, "value": "https://example.com"}]
+
+        with patch.object(resolver, "_get_project_refs") as get_refs:
+            resolved = resolver.resolve_references(session, 1, steps)
+
+        get_refs.assert_not_called()
+        assert resolved == steps
+
+    @pytest.mark.asyncio
+    async def test_async_variant_matches_sync(self, session):
+        steps = [
+            {"action": "navigate", "target": None, "value": "{{login}}"},
+            {"action": "type", "target": "Password", "value": "{{admin.password}}"},
+        ]
+
+        resolved = await resolver.resolve_references_async(1, steps)
+
+        assert resolved == [
+            {"action": "navigate", "target": None, "value": "http://shop.test/login"},
+            {"action": "type", "target": "Password", "value": "s3cret"},
+        ]
+
+
+class TestMaskPasswords:
+    """Tests for mask_passwords_in_steps."""
+
+    def test_masks_password_fields_only(self):
+        steps = [
+            {"action": "fill_form", "value": '{"email": "a@b.c", "Password": "s3cret"}'},
+            {"action": "type", "target": "Password input", "value": "s3cret"},
+            {"action": "type", "target": "Email", "value": "a@b.c"},
+        ]
+
+        masked = resolver.mask_passwords_in_steps(steps, mask="***")
+
+        assert masked[0]["value"] == '{"email":"a@b.c","Password":"***"}'
+        assert masked[1]["value"] == "***"
+        assert masked[2]["value"] == "a@b.c"
+        assert steps[1]["value"] == "s3cret"
+
+    def test_has_password_steps(self):
+        steps = [
+            {"action": "type", "target": "Email", "value": "a@b.c"},
+            {"action": "fill_form", "value": '{"email": "a@b.c"}'},
+            {"action": "navigate", "value": "/password-reset"},
+        ]
+
+        assert not resolver.has_password_steps(steps)
+        assert resolver.has_password_steps(
+            steps + [{"action": "type", "target": "Password", "value": "s3cret"}]
+        )
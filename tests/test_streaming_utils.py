@@ -5,6 +5,7 @@ import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 
 from api.utils.streaming import (
+    coalesce_frames,
     sse_event,
     sse_error,
     sse_warning,
@@ -65,6 +66,43 @@ class TestSSEHelpers:
         assert sse_warning("warn").endswith("\n\n")
 
 
+class TestCoalesceFrames:
+    """Tests for coalescing SSE frames into fewer writes."""
+
+    @pytest.mark.asyncio
+    async def test_ready_frames_are_merged(self):
+        """Frames produced without waiting go out as one chunk."""
+        async def frames():
+            for i in range(3):
+                yield f"data: {i}\n\n".encode()
+
+        chunks = [c async for c in coalesce_frames(frames())]
+        assert chunks == [b"data: 0\n\ndata: 1\n\ndata: 2\n\n"]
+
+    @pytest.mark.asyncio
+    async def test_chunks_are_capped(self):
+        """A chunk stops growing once it reaches max_bytes."""
+        async def frames():
+            for _ in range(4):
+                yield b"x" * 10
+
+        chunks = [c async for c in coalesce_frames(frames(), max_bytes=20)]
+        assert chunks == [b"x" * 20, b"x" * 20]
+
+    @pytest.mark.asyncio
+    async def test_source_error_is_raised_after_pending_frames(self):
+        """Frames before a source error are still delivered."""
+        async def frames():
+            yield b"data: ok\n\n"
+            raise RuntimeError("executor gone")
+
+        received = []
+        with pytest.raises(RuntimeError, match="executor gone"):
+            async for chunk in coalesce_frames(frames()):
+                received.append(chunk)
+        assert received == [b"data: ok\n\n"]
+
+
 class TestStreamingContext:
     """Tests for streaming_context context manager."""
 